@@ -0,0 +1,71 @@
+"""比较各 JSON 后端在录制载荷上的编解码耗时
+
+用法: python benchmarks/bench_json_codec.py [-n 次数]
+"""
+
+import argparse
+from pathlib import Path
+import timeit
+
+from nonebot.adapters.villa.codec import _CODEC_FACTORIES, JSONCodec, set_json_backend
+from nonebot.adapters.villa.compat import model_dump, type_validator
+from nonebot.adapters.villa.event import SendMessageEvent
+
+PAYLOAD_DIR = Path(__file__).parent / "payloads"
+
+
+def load_payloads() -> dict:
+    return {path.stem: path.read_bytes() for path in PAYLOAD_DIR.glob("*.json")}
+
+
+def available_codecs() -> list:
+    codecs = []
+    for factory in _CODEC_FACTORIES.values():
+        try:
+            codecs.append(factory())
+        except ImportError:
+            continue
+    return codecs
+
+
+def bench(codec: JSONCodec, payloads: dict, number: int) -> None:
+    for name, raw in payloads.items():
+        obj = codec.loads(raw)
+        decode = timeit.timeit(lambda: codec.loads(raw), number=number)  # noqa: B023
+        encode = timeit.timeit(lambda: codec.dumps(obj), number=number)  # noqa: B023
+        print(  # noqa: T201
+            f"{codec.name:<8} {name:<28} "
+            f"loads {decode / number * 1e6:8.2f} us  "
+            f"dumps {encode / number * 1e6:8.2f} us",
+        )
+    set_json_backend(codec.name)  # type: ignore
+    validate_event = type_validator(SendMessageEvent)
+
+    def parse_event() -> SendMessageEvent:
+        data = codec.loads(payloads["send_message_event"])["event"]
+        return validate_event(data)
+
+    info = parse_event().content
+    event = timeit.timeit(parse_event, number=number)
+    model = timeit.timeit(
+        lambda: codec.dumps(model_dump(info, by_alias=True, exclude_none=True)),
+        number=number,
+    )
+    print(  # noqa: T201
+        f"{codec.name:<8} {'parse send_message_event':<28} "
+        f"{event / number * 1e6:8.2f} us  "
+        f"dump content {model / number * 1e6:8.2f} us",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=10000)
+    args = parser.parse_args()
+    payloads = load_payloads()
+    for codec in available_codecs():
+        bench(codec, payloads, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""测量当前 pydantic 版本下的事件解析与消息序列化耗时
+
+分别在 pydantic v1 与 v2 环境中运行以进行对比
+用法: python benchmarks/bench_pydantic.py [-n 次数]
+"""
+
+import argparse
+import json
+from pathlib import Path
+import timeit
+
+from nonebot.adapters.villa.codec import model_dumps
+from nonebot.adapters.villa.compat import model_validate, type_validator
+from nonebot.adapters.villa.event import event_classes
+from nonebot.adapters.villa.models import (
+    MentionedInfo,
+    MentionType,
+    MessageContentInfo,
+    TextEntity,
+    TextMessageContent,
+)
+
+from pydantic import VERSION
+
+PAYLOAD_DIR = Path(__file__).parent / "payloads"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=10000)
+    args = parser.parse_args()
+    number: int = args.number
+
+    raw = (PAYLOAD_DIR / "send_message_event.json").read_text(encoding="utf-8")
+    validate_event = type_validator(event_classes)
+    event = timeit.timeit(
+        lambda: validate_event(json.loads(raw)["event"]),
+        number=number,
+    )
+
+    content_info = MessageContentInfo(
+        content=TextMessageContent(
+            text="@旅行者 今日签到成功，获得原石 x60",
+            entities=[
+                model_validate(
+                    TextEntity,
+                    {
+                        "offset": 0,
+                        "length": 5,
+                        "entity": {
+                            "type": "mentioned_user",
+                            "user_id": "20000007",
+                            "user_name": "旅行者",
+                        },
+                    },
+                ),
+            ],
+        ),
+        mentionedInfo=MentionedInfo(type=MentionType.PART, userIdList=["20000007"]),
+    )
+    serialize = timeit.timeit(
+        lambda: model_dumps(content_info, by_alias=True, exclude_none=True),
+        number=number,
+    )
+
+    print(f"pydantic {VERSION}")  # noqa: T201
+    print(f"parse send_message_event  {event / number * 1e6:8.2f} us")  # noqa: T201
+    print(f"serialize message content {serialize / number * 1e6:8.2f} us")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import time
 from typing import Any, Dict, List, Literal, Optional, cast
 from typing_extensions import override
@@ -19,9 +18,9 @@ from nonebot.drivers import (
 from nonebot.exception import WebSocketClosed
 from nonebot.utils import escape_tag
 
-from pydantic import parse_obj_as
-
 from .bot import Bot
+from .codec import dumps, loads, set_json_backend
+from .compat import model_dump, type_validator
 from .config import BotInfo, Config
 from .event import (
     Event,
@@ -44,6 +43,8 @@ from .payload import (
 )
 from .utils import API, log
 
+_validate_event = type_validator(event_classes)
+
 
 class Adapter(BaseAdapter):
     bots: Dict[str, Bot]
@@ -51,7 +52,8 @@ class Adapter(BaseAdapter):
     @override
     def __init__(self, driver: Driver, **kwargs: Any):
         super().__init__(driver, **kwargs)
-        self.villa_config: Config = Config(**self.config.dict())
+        self.villa_config: Config = Config(**model_dump(self.config))
+        set_json_backend(self.villa_config.villa_json_backend)
         self.tasks: List[asyncio.Task] = []
         self.ws: Dict[str, WebSocket] = {}
         self.base_url: URL = URL("https://bbs-api.miyoushe.com/vila/api/bot/platform")
@@ -66,6 +68,7 @@ class Adapter(BaseAdapter):
         self.driver.on_startup(self._forward_http)
         self.driver.on_startup(self._start_forward)
         self.driver.on_shutdown(self._stop_forwards)
+        self.driver.on_shutdown(self._flush_caches)
 
     async def _forward_http(self):
         webhook_bots = [
@@ -106,13 +109,10 @@ class Adapter(BaseAdapter):
 
     async def _handle_http(self, request: Request) -> Response:
         if data := request.content:
-            json_data = json.loads(data)
+            json_data = loads(data)
             if payload_data := json_data.get("event"):
                 try:
-                    event = parse_obj_as(
-                        event_classes,
-                        payload_data,
-                    )
+                    event = _validate_event(payload_data)
                     bot_id = event.bot_id
                     if (bot := self.bots.get(bot_id, None)) is None:
                         if (
@@ -142,7 +142,7 @@ class Adapter(BaseAdapter):
                             )
                             return Response(
                                 200,
-                                content=json.dumps(
+                                content=dumps(
                                     {"retcode": 0, "message": "NoneBot2 Get it!"},
                                 ),
                             )
@@ -167,7 +167,7 @@ class Adapter(BaseAdapter):
                     asyncio.create_task(bot.handle_event(event))
                 return Response(
                     200,
-                    content=json.dumps({"retcode": 0, "message": "NoneBot2 Get it!"}),
+                    content=dumps({"retcode": 0, "message": "NoneBot2 Get it!"}),
                 )
             return Response(415, content="Invalid Request Body")
         return Response(415, content="Invalid Request Body")
@@ -270,6 +270,9 @@ class Adapter(BaseAdapter):
                 )
                 await asyncio.sleep(3.0)
 
+    async def _flush_caches(self) -> None:
+        await asyncio.gather(*(bot._flush_caches() for bot in self.bots.values()))
+
     async def _stop_forwards(self) -> None:
         await asyncio.gather(
             *[
@@ -405,10 +408,7 @@ class Adapter(BaseAdapter):
         elif payload.biz_type == BizType.SHUTDOWN:
             payload = Shutdown()
         elif payload.biz_type == BizType.EVENT:
-            return parse_obj_as(
-                event_classes,
-                proto_to_event_data(payload.body_data),
-            )
+            return _validate_event(proto_to_event_data(payload.body_data))
         else:
             raise ReconnectError
         log("TRACE", f"Received payload: {escape_tag(repr(payload))}")
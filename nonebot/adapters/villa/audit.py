@@ -0,0 +1,187 @@
+import asyncio
+from collections import deque
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import LRUCache, TTLCache
+from .event import AuditCallbackEvent, AuditResult
+from .models import ContentType
+
+
+class AuditWaiter:
+    """按 audit_id 关联审核请求与审核结果回调事件
+
+    回调事件可能早于审核接口的响应到达，这类事件会暂存在一个有限大小的缓存中。
+    提交审核前需要先通过 `reserve` 占用等待名额，结束后调用 `release` 释放
+
+    参数:
+        max_pending: 最多同时等待的审核数
+        early_size: 暂存提前到达的回调事件的最大数量
+    """
+
+    def __init__(self, max_pending: int = 1024, early_size: int = 256) -> None:
+        self.max_pending = max_pending
+        self._pending: Dict[str, "asyncio.Future[AuditCallbackEvent]"] = {}
+        self._reserved = 0
+        self._early: LRUCache[str, AuditCallbackEvent] = LRUCache(early_size)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def full(self) -> bool:
+        return self._reserved >= self.max_pending
+
+    def reserve(self) -> None:
+        """占用一个等待名额
+
+        异常:
+            RuntimeError: 等待中的审核数已达上限
+        """
+        if self.full:
+            raise RuntimeError("too many pending audits")
+        self._reserved += 1
+
+    def release(self) -> None:
+        """释放 `reserve` 占用的等待名额"""
+        self._reserved -= 1
+
+    def register(self, audit_id: str) -> "asyncio.Future[AuditCallbackEvent]":
+        """登记等待的审核，返回审核结果回调事件的 Future"""
+        future = asyncio.get_running_loop().create_future()
+        if (event := self._early.pop(audit_id)) is not None:
+            future.set_result(event)
+        else:
+            self._pending[audit_id] = future
+        return future
+
+    def discard(self, audit_id: str) -> None:
+        self._pending.pop(audit_id, None)
+
+    def resolve(self, event: AuditCallbackEvent) -> bool:
+        """使用回调事件完成对应的等待，没有对应的等待时暂存该事件
+
+        返回:
+            bool: 是否有等待该结果的审核
+        """
+        if (future := self._pending.pop(event.audit_id, None)) is None:
+            self._early[event.audit_id] = event
+            return False
+        if not future.done():
+            future.set_result(event)
+        return True
+
+
+class KeywordMatcher:
+    """基于 Aho-Corasick 自动机的多关键词匹配，耗时与文本长度成正比，与关键词数量无关
+
+    参数:
+        keywords: 关键词列表
+        ignore_case: 是否忽略大小写
+    """
+
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = True) -> None:
+        self.ignore_case = ignore_case
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[str]] = [None]
+        self._dict_link: List[int] = [0]
+        for keyword in keywords:
+            if keyword:
+                self._add(keyword)
+        self._build()
+
+    def __len__(self) -> int:
+        return sum(output is not None for output in self._output)
+
+    def _add(self, keyword: str) -> None:
+        node = 0
+        for char in self._normalize(keyword):
+            if (child := self._goto[node].get(char)) is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+                self._goto[node][char] = child
+            node = child
+        self._output[node] = keyword
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._dict_link[child] = (
+                    fail if self._output[fail] is not None else self._dict_link[fail]
+                )
+
+    def _normalize(self, text: str) -> str:
+        return text.casefold() if self.ignore_case else text
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """遍历文本中出现的关键词，返回 (结束位置, 关键词)"""
+        goto, fail, output, dict_link = (
+            self._goto,
+            self._fail,
+            self._output,
+            self._dict_link,
+        )
+        node = 0
+        for index, char in enumerate(self._normalize(text)):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            match = node if output[node] is not None else dict_link[node]
+            while match:
+                yield index, output[match]  # type: ignore
+                match = dict_link[match]
+
+    def find(self, text: str) -> Optional[str]:
+        """查找文本中第一个出现的关键词"""
+        return next((keyword for _, keyword in self.iter_matches(text)), None)
+
+
+def audit_content_key(audit_content: str, content_type: ContentType) -> str:
+    """审核结果缓存使用的内容哈希"""
+    return hashlib.sha256(
+        f"{content_type.value}\0{audit_content}".encode(),
+    ).hexdigest()
+
+
+class AuditResultCache:
+    """以内容哈希为键的审核结果缓存
+
+    通过 `Bot.audit` 提交的内容会按 audit_id 记录其哈希，
+    收到对应的 `AuditCallbackEvent` 时记录审核结果
+
+    参数:
+        maxsize: 最多缓存的审核结果数
+        ttl: 审核结果的有效时间，单位为秒
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600) -> None:
+        self._results: TTLCache[str, AuditResult] = TTLCache(maxsize, ttl)
+        self._submitted: LRUCache[str, str] = LRUCache(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: str) -> Optional[AuditResult]:
+        return self._results.get(key)
+
+    def set(self, key: str, result: AuditResult) -> None:
+        self._results[key] = result
+
+    def submitted(self, audit_id: str, key: str) -> None:
+        self._submitted[audit_id] = key
+
+    def resolve(self, event: AuditCallbackEvent) -> None:
+        if (key := self._submitted.pop(event.audit_id)) is not None:
+            self._results[key] = event.audit_result
@@ -0,0 +1,76 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from .exception import RateLimited
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+ProgressCallback = Callable[[int, int], Any]
+"""进度回调，参数为 (已完成数, 总数)"""
+
+
+async def run_batch(
+    items: Sequence[T],
+    func: Callable[[T], Awaitable[R]],
+    concurrency: int = 8,
+    max_retries: int = 3,
+    retry_interval: float = 1.0,
+    on_progress: Optional[ProgressCallback] = None,
+) -> List[Union[R, Exception]]:
+    """以有限的并发对每一项执行异步操作
+
+    遇到频率限制时按指数退避重试，单项失败不影响其他项。
+    取消时正在进行的操作会一同取消。
+
+    参数:
+        items: 操作对象列表
+        func: 对单项执行的异步函数
+        concurrency: 最大并发数
+        max_retries: 遇到频率限制时的最大重试次数
+        retry_interval: 首次重试前的等待时间，单位为秒
+        on_progress: 每完成一项时调用的进度回调
+
+    返回:
+        List[Union[R, Exception]]: 与输入顺序一致的结果，失败的项对应位置为异常对象
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    total = len(items)
+    done = 0
+
+    async def _run(item: T) -> R:
+        nonlocal done
+        attempt = 0
+        try:
+            while True:
+                async with semaphore:
+                    try:
+                        return await func(item)
+                    except RateLimited:
+                        if attempt >= max_retries:
+                            raise
+                await asyncio.sleep(retry_interval * 2**attempt)
+                attempt += 1
+        finally:
+            done += 1
+            if on_progress is not None:
+                on_progress(done, total)
+
+    results = await asyncio.gather(
+        *(_run(item) for item in items),
+        return_exceptions=True,
+    )
+    for result in results:
+        if not isinstance(result, Exception) and isinstance(result, BaseException):
+            raise result
+    return cast(List[Union[R, Exception]], results)
@@ -1,17 +1,23 @@
 import asyncio
 import base64
+import contextlib
+from contextvars import ContextVar
 import hashlib
 import hmac
 from io import BytesIO
 from pathlib import Path
 from typing import (
+    IO,
     TYPE_CHECKING,
     Any,
     AsyncIterator,
     Dict,
+    Hashable,
+    Iterable,
     List,
     NoReturn,
     Optional,
+    Sequence,
     Tuple,
     Union,
     cast,
@@ -24,11 +30,49 @@ from nonebot.drivers import Request, Response
 from nonebot.message import handle_event
 from nonebot.utils import escape_tag
 
-from pydantic import parse_obj_as
 import rsa
 
+from .audit import (
+    AuditResultCache,
+    AuditWaiter,
+    KeywordMatcher,
+    audit_content_key,
+)
+from .batch import ProgressCallback, run_batch
+from .cache import AsyncCachedValue, LRUCache, SingleFlight, TTLCache
+from .codec import loads, model_dumps
+from .compat import model_validate
+from .component import component_router
 from .config import BotInfo
-from .event import AddQuickEmoticonEvent, Event, SendMessageEvent
+from .context import VillaContext
+from .decoder import (
+    decode_check_member_bot_access_token,
+    decode_emoticon_list,
+    decode_group_list,
+    decode_group_room_list,
+    decode_image_upload_result,
+    decode_member,
+    decode_member_list,
+    decode_member_role,
+    decode_member_role_list,
+    decode_room,
+    decode_upload_image_params,
+    decode_villa,
+    decode_websocket_info,
+    is_raw_response,
+    raw_response,
+)
+from .directory import MemberDirectory
+from .emoticon import EmoticonCatalog
+from .event import (
+    AddQuickEmoticonEvent,
+    AuditCallbackEvent,
+    AuditResult,
+    ClickMsgComponentEvent,
+    Event,
+    JoinVillaEvent,
+    SendMessageEvent,
+)
 from .exception import (
     ActionFailed,
     BotNotAdded,
@@ -38,9 +82,18 @@ from .exception import (
     InvalidRequest,
     NetworkError,
     PermissionDenied,
+    RateLimited,
     UnknownServerError,
     UnsupportedMsgType,
 )
+from .export import AsyncWriter, export_villa_members
+from .image import (
+    ImageSource,
+    ImageUploadCache,
+    PreparedImage,
+    TransferImageCache,
+    prepare_image_async,
+)
 from .message import (
     BadgeSegment,
     ComponentsSegment,
@@ -90,12 +143,47 @@ from .models import (
     VillaRoomLink,
     WebsocketInfo,
 )
-from .utils import API, get_img_extenion, get_img_md5, log
+from .rooms import RoomTree
+from .utils import API, log
 
 if TYPE_CHECKING:
     from .adapter import Adapter
 
 
+class _APIMemo:
+    """处理单个事件期间记录的查询请求
+
+    处理事件期间创建的任务会复制上下文并持有该对象，
+    因此事件处理结束后需要关闭，关闭后不再记录和使用请求结果
+    """
+
+    __slots__ = ("tasks", "closed")
+
+    def __init__(self) -> None:
+        self.tasks: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+        self.tasks.clear()
+
+
+_api_memo: ContextVar[Optional[_APIMemo]] = ContextVar("_api_memo", default=None)
+# 处理事件期间可以复用结果的 GET 接口，分页接口的结果不会被记录
+_MEMO_ENDPOINTS = frozenset(
+    (
+        "getVilla",
+        "getMember",
+        "getGroupList",
+        "getRoom",
+        "getVillaGroupRoomList",
+        "getMemberRoleInfo",
+        "getVillaMemberRoles",
+    ),
+)
+_MEMO_MAXSIZE = 32
+
+
 def _check_at_me(bot: "Bot", event: SendMessageEvent):
     """检查事件是否和机器人有关，如果有关则设置 to_me 为 True，并删除消息中的 at 信息。
 
@@ -179,6 +267,67 @@ class Bot(BaseBot):
         self._bot_info: Optional[Robot] = None
         self._ws_info: Optional[WebsocketInfo] = None
         self._ws_squence: int = 0
+        self._content_cache: Optional[LRUCache[Hashable, Tuple[str, str]]] = (
+            LRUCache(bot_info.content_cache_size)
+            if bot_info.content_cache_size > 0
+            else None
+        )
+        self._upload_cache: Optional[ImageUploadCache] = (
+            ImageUploadCache(bot_info.upload_cache_size, bot_info.upload_cache_path)
+            if bot_info.upload_cache_size > 0
+            else None
+        )
+        self._upload_cache_validate = bot_info.upload_cache_validate
+        self._transfer_cache: Optional[TransferImageCache] = (
+            TransferImageCache(
+                bot_info.transfer_cache_size,
+                bot_info.transfer_cache_ttl,
+                bot_info.transfer_cache_path,
+            )
+            if bot_info.transfer_cache_size > 0
+            else None
+        )
+        self._transfer_flight: SingleFlight[str, str] = SingleFlight()
+        self._member_directories: Dict[int, MemberDirectory] = {}
+        self._audit_waiter = AuditWaiter(bot_info.max_pending_audits)
+        self.audit_keywords: Optional[KeywordMatcher] = (
+            KeywordMatcher(bot_info.audit_keywords) if bot_info.audit_keywords else None
+        )
+        """本地预审核使用的关键词自动机"""
+        self._audit_cache: Optional[AuditResultCache] = (
+            AuditResultCache(bot_info.audit_cache_size, bot_info.audit_cache_ttl)
+            if bot_info.audit_cache_size > 0
+            else None
+        )
+        self._member_cache: Optional[TTLCache[Tuple[int, int], Member]] = (
+            TTLCache(bot_info.member_cache_size, bot_info.member_cache_ttl)
+            if bot_info.member_cache_size > 0
+            else None
+        )
+        self._nickname_cache: Optional[LRUCache[Tuple[int, int], str]] = (
+            LRUCache(bot_info.nickname_cache_size)
+            if bot_info.nickname_cache_size > 0
+            else None
+        )
+        self._room_cache_ttl = bot_info.room_cache_ttl
+        self._room_trees: Dict[int, AsyncCachedValue[RoomTree]] = {}
+        self._villa_cache_ttl = bot_info.villa_cache_ttl
+        self._token_cache: Optional[
+            TTLCache[
+                Tuple[int, str],
+                Union[CheckMemberBotAccessTokenReturn, ApiResponse],
+            ]
+        ] = (
+            TTLCache(bot_info.token_cache_size, bot_info.token_cache_ttl)
+            if bot_info.token_cache_size > 0
+            else None
+        )
+        self._token_cache_negative_ttl = bot_info.token_cache_negative_ttl
+        self._villa_contexts: Dict[int, VillaContext] = {}
+        self._emoticon_catalog: AsyncCachedValue[EmoticonCatalog] = AsyncCachedValue(
+            self._load_emoticon_catalog,
+            bot_info.emoticon_cache_ttl,
+        )
 
     @override
     def __repr__(self) -> str:
@@ -235,10 +384,51 @@ class Bot(BaseBot):
         self._ws_info = ws_info
 
     async def handle_event(self, event: Event):
-        """处理事件"""
+        """处理事件
+
+        处理同一个事件期间，相同的查询请求(不含分页接口)只会发送一次，
+        发送其他请求后已记录的结果会被清空。
+        已在 `component_router` 中注册回调的组件点击事件不再交给事件响应器处理
+        """
+        if (context := self._villa_contexts.get(event.robot.villa_id)) is not None:
+            context.refresh_in_background()
         if isinstance(event, SendMessageEvent):
             _check_at_me(self, event)
-        await handle_event(self, event)
+            self._remember_nickname(event.villa_id, event.from_user_id, event.nickname)
+            if (
+                (quote := event.quote_msg) is not None
+                and quote.from_user_nickname
+                and quote.from_user_id_str
+            ):
+                self._remember_nickname(
+                    event.villa_id,
+                    int(quote.from_user_id_str),
+                    quote.from_user_nickname,
+                )
+        elif isinstance(event, AuditCallbackEvent):
+            self._audit_waiter.resolve(event)
+            if self._audit_cache is not None:
+                self._audit_cache.resolve(event)
+        elif isinstance(event, JoinVillaEvent):
+            self._remember_nickname(
+                event.villa_id,
+                event.join_uid,
+                event.join_user_nickname,
+            )
+            if (directory := self._member_directories.get(event.villa_id)) is not None:
+                directory.on_join(event)
+        memo = _APIMemo()
+        token = _api_memo.set(memo)
+        try:
+            if isinstance(
+                event,
+                ClickMsgComponentEvent,
+            ) and await component_router.dispatch(self, event):
+                return
+            await handle_event(self, event)
+        finally:
+            memo.close()
+            _api_memo.reset(token)
 
     def _verify_signature(
         self,
@@ -278,9 +468,12 @@ class Bot(BaseBot):
     async def _handle_respnose(self, response: Response) -> Any:
         if not response.content:
             raise NetworkError("API request error when parsing response")
-        resp = ApiResponse.parse_raw(response.content)
-        if resp.retcode == 0:
-            return resp.data
+        content = loads(response.content)
+        if content.get("retcode") == 0:
+            return content.get("data")
+        resp = model_validate(ApiResponse, content)
+        if response.status_code == 429:
+            raise RateLimited(resp)
         if resp.retcode == -502:
             raise UnknownServerError(resp)
         if resp.retcode == -1:
@@ -300,6 +493,34 @@ class Bot(BaseBot):
         raise ActionFailed(response.status_code, resp)
 
     async def _request(self, request: Request):
+        if (memo := _api_memo.get()) is None or memo.closed:
+            return await self._send_request(request)
+        tasks = memo.tasks
+        if request.method != "GET":
+            tasks.clear()
+            return await self._send_request(request)
+        if request.url.name not in _MEMO_ENDPOINTS:
+            return await self._send_request(request)
+        key = (
+            self.self_id,
+            str(request.url),
+            request.headers.get("x-rpc-bot_villa_id"),
+            is_raw_response(),
+        )
+        if (task := tasks.get(key)) is None:
+            if len(tasks) >= _MEMO_MAXSIZE:
+                return await self._send_request(request)
+            task = asyncio.ensure_future(self._send_request(request))
+            tasks[key] = task
+
+            def _discard_failed(task: "asyncio.Task[Any]") -> None:
+                if (task.cancelled() or task.exception()) and tasks.get(key) is task:
+                    del tasks[key]
+
+            task.add_done_callback(_discard_failed)
+        return await asyncio.shield(task)
+
+    async def _send_request(self, request: Request):
         try:
             resp = await self.adapter.request(request)
             log(
@@ -327,23 +548,47 @@ class Bot(BaseBot):
             str: 消息 ID
         """
         message = message if isinstance(message, Message) else Message(message)
-        content_info = await self.parse_message_content(message)
-        if isinstance(content_info.content, PostMessageContent):
-            object_name = "MHY:Post"
-        elif isinstance(content_info.content, ImageMessageContent):
-            object_name = "MHY:Image"
+        cache = self._content_cache
+        cache_key = message.fingerprint() if cache is not None else None
+        if (
+            cache is not None
+            and cache_key is not None
+            and (cached := cache.get(cache_key)) is not None
+        ):
+            object_name, msg_content = cached
         else:
-            object_name = "MHY:Text"
-        return await self.send_message(
+            content_info = await self.parse_message_content(message)
+            if isinstance(content_info.content, PostMessageContent):
+                object_name = "MHY:Post"
+            elif isinstance(content_info.content, ImageMessageContent):
+                object_name = "MHY:Image"
+            else:
+                object_name = "MHY:Text"
+            msg_content = model_dumps(
+                content_info,
+                by_alias=True,
+                exclude_none=True,
+            )
+            if cache is not None and cache_key is not None:
+                cache[cache_key] = (object_name, msg_content)
+        bot_msg_id = await self.send_message(
             villa_id=villa_id,
             room_id=room_id,
             object_name=object_name,
-            msg_content=content_info.json(
-                by_alias=True,
-                exclude_none=True,
-                ensure_ascii=False,
-            ),
+            msg_content=msg_content,
         )
+        panel_seg = cast(Optional[List[PanelSegment]], message["panel"] or None)
+        if panel_seg or message["components"]:
+            component_router.track(
+                bot_msg_id,
+                (
+                    component
+                    for seg in message["components"]
+                    for component in cast(ComponentsSegment, seg).data["components"]
+                ),
+                panel_seg[-1].data["panel"] if panel_seg else None,
+            )
+        return bot_msg_id
 
     @override
     async def send(
@@ -390,6 +635,24 @@ class Bot(BaseBot):
             message=message,
         )
 
+    def _remember_nickname(self, villa_id: int, uid: int, nickname: str) -> None:
+        if self._nickname_cache is not None:
+            self._nickname_cache[(villa_id, uid)] = nickname
+
+    async def _get_nickname(self, villa_id: int, uid: int) -> str:
+        if self._nickname_cache is not None and (
+            nickname := self._nickname_cache.get((villa_id, uid))
+        ):
+            return nickname
+        if (directory := self._member_directories.get(villa_id)) is not None and (
+            entry := directory.get(uid)
+        ) is not None:
+            return entry.nickname
+        with raw_response(False):
+            user = await self.get_member(villa_id=villa_id, uid=uid)
+        self._remember_nickname(villa_id, uid, user.basic.nickname)
+        return user.basic.nickname
+
     async def parse_message_content(self, message: Message) -> MessageContentInfo:
         """将适配器的Message对象转为大别野发送所需要的MessageContentInfo对象
 
@@ -476,13 +739,15 @@ class Bot(BaseBot):
                     if mention_user.user_name is None:
                         if not seg.data["villa_id"]:
                             raise ValueError("cannot get user name without villa_id")
-                        # 需要调用API获取被@的用户的昵称
-                        user = await self.get_member(
-                            villa_id=seg.data["villa_id"],
-                            uid=int(mention_user.user_id),
+                        # 先查找昵称缓存，未命中时调用API获取被@的用户的昵称
+                        nickname = await self._get_nickname(
+                            seg.data["villa_id"],
+                            int(mention_user.user_id),
                         )
-                        seg_text = f"@{user.basic.nickname} "
-                        mention_user.user_name = user.basic.nickname
+                        seg_text = f"@{nickname} "
+                        mention_user.user_name = nickname
+                        # 紧凑消息段的 data 中的模型是临时构造的，需要写回
+                        seg.data["mention_user"] = mention_user
                     else:
                         seg_text = f"@{mention_user.user_name} "
                     length = cal_len(seg_text)
@@ -498,12 +763,14 @@ class Bot(BaseBot):
                     room_link: VillaRoomLink = seg.data["room_link"]
                     if room_link.room_name is None:
                         # 需要调用API获取房间的名称
-                        room = await self.get_room(
-                            villa_id=int(room_link.villa_id),
-                            room_id=int(room_link.room_id),
-                        )
+                        with raw_response(False):
+                            room = await self.get_room(
+                                villa_id=int(room_link.villa_id),
+                                room_id=int(room_link.room_id),
+                            )
                         seg_text = f"#{room.room_name} "
                         room_link.room_name = room.room_name
+                        seg.data["room_link"] = room_link
                     else:
                         seg_text = f"#{room_link.room_name} "
                     length = cal_len(seg_text)
@@ -576,10 +843,22 @@ class Bot(BaseBot):
             ),
             json={"token": token},
         )
-        return parse_obj_as(
-            CheckMemberBotAccessTokenReturn,
-            await self._request(request),
-        )
+        cache = self._token_cache
+        if cache is None or is_raw_response():
+            return decode_check_member_bot_access_token(await self._request(request))
+        key = (villa_id, hashlib.sha256(token.encode()).hexdigest())
+        if (cached := cache.get(key)) is not None:
+            # 只缓存失败的响应，每次命中都抛出新的异常，避免异常的 traceback 不断累积
+            if isinstance(cached, ApiResponse):
+                raise InvalidMemberBotAccessToken(cached)
+            return cached
+        try:
+            result = decode_check_member_bot_access_token(await self._request(request))
+        except InvalidMemberBotAccessToken as e:
+            cache.set(key, e.response, self._token_cache_negative_ttl)
+            raise
+        cache[key] = result
+        return result
 
     @API
     async def get_villa(self, villa_id: int) -> Villa:
@@ -588,7 +867,25 @@ class Bot(BaseBot):
             url=self.adapter.base_url / "getVilla",
             headers=self.get_authorization_header(villa_id),
         )
-        return parse_obj_as(Villa, (await self._request(request))["villa"])
+        return decode_villa(await self._request(request))
+
+    def get_villa_context(self, villa_id: int) -> VillaContext:
+        """获取大别野上下文，可通过事件的 `villa_id` 获取
+
+        参数:
+            villa_id: 大别野 ID
+
+        返回:
+            VillaContext: 大别野上下文
+        """
+        if (context := self._villa_contexts.get(villa_id)) is None:
+            context = VillaContext(self, villa_id, self._villa_cache_ttl)
+            self._villa_contexts[villa_id] = context
+        return context
+
+    def _invalidate_roles(self, villa_id: int) -> None:
+        if (context := self._villa_contexts.get(villa_id)) is not None:
+            context.invalidate_roles()
 
     @API
     async def get_member(
@@ -603,7 +900,47 @@ class Bot(BaseBot):
             headers=self.get_authorization_header(villa_id),
             params={"uid": uid},
         )
-        return parse_obj_as(Member, (await self._request(request))["member"])
+        return decode_member(await self._request(request))
+
+    async def get_members(
+        self,
+        villa_id: int,
+        uids: Iterable[int],
+        concurrency: int = 8,
+    ) -> Dict[int, Union[Member, Exception]]:
+        """批量获取用户信息
+
+        重复的用户 ID 只会请求一次，缓存中已有的用户不再请求，
+        其余用户以有限的并发请求，遇到频率限制时自动退避重试
+
+        参数:
+            villa_id: 大别野 ID
+            uids: 用户 ID 列表
+            concurrency: 最大并发请求数
+
+        返回:
+            Dict[int, Union[Member, Exception]]: 用户 ID 到用户信息的映射，
+                获取失败的用户对应的值为异常对象
+        """
+        cache = self._member_cache
+        result: Dict[int, Union[Member, Exception]] = {}
+        pending: List[int] = []
+        for uid in dict.fromkeys(uids):
+            if cache is not None and (member := cache.get((villa_id, uid))) is not None:
+                result[uid] = member
+            else:
+                pending.append(uid)
+
+        async def _get(uid: int) -> Member:
+            with raw_response(False):
+                return await self.get_member(villa_id=villa_id, uid=uid)
+
+        members = await run_batch(pending, _get, concurrency)
+        for uid, member in zip(pending, members):
+            result[uid] = member
+            if cache is not None and isinstance(member, Member):
+                cache[(villa_id, uid)] = member
+        return result
 
     @API
     async def get_villa_members(
@@ -620,7 +957,7 @@ class Bot(BaseBot):
             params={"offset_str": offset_str, "size": size},
         )
         result = await self._request(request)
-        return parse_obj_as(List[Member], result["list"]), result["next_offset_str"]
+        return decode_member_list(result), result["next_offset_str"]
 
     def iter_villa_members(
         self,
@@ -637,6 +974,88 @@ class Bot(BaseBot):
             interval=interval,
         )
 
+    def member_directory(self, villa_id: int) -> MemberDirectory:
+        """获取大别野的成员目录，首次获取时需要调用 `sync` 同步
+
+        参数:
+            villa_id: 大别野 ID
+
+        返回:
+            MemberDirectory: 成员目录
+        """
+        if (directory := self._member_directories.get(villa_id)) is None:
+            directory = MemberDirectory(self, villa_id)
+            self._member_directories[villa_id] = directory
+        return directory
+
+    def stream_villa_members(
+        self,
+        villa_id: int,
+        offset_str: str = "",
+        size: int = 10,
+        max_size: int = 100,
+        interval: float = 0.3,
+        min_interval: float = 0.05,
+    ) -> "VillaMemberStream":
+        """预取下一页的大别野成员迭代器
+
+        调用方处理当前页时会在后台获取下一页，
+        并根据请求结果自动调整分页大小和请求间隔
+
+        参数:
+            villa_id: 大别野 ID
+            offset_str: 起始位置
+            size: 初始分页大小
+            max_size: 最大分页大小
+            interval: 初始请求间隔
+            min_interval: 最小请求间隔
+
+        返回:
+            VillaMemberStream: 按页迭代的成员迭代器，`members()` 可按成员迭代
+
+        用法:
+            ```python
+            async with bot.stream_villa_members(villa_id) as stream:
+                async for page in stream:
+                    ...
+            ```
+        """
+        return VillaMemberStream(
+            bot=self,
+            villa_id=villa_id,
+            offset_str=offset_str,
+            size=size,
+            max_size=max_size,
+            interval=interval,
+            min_interval=min_interval,
+        )
+
+    async def export_villa_members(
+        self,
+        villa_id: int,
+        output: Union[Path, AsyncWriter],
+        checkpoint: Optional[Path] = None,
+        **kwargs: Any,
+    ) -> int:
+        """以 NDJSON 格式流式导出大别野成员
+
+        参数:
+            villa_id: 大别野 ID
+            output: 输出文件路径，或拥有异步 `write(bytes)` 方法的对象
+            checkpoint: 断点文件路径，中断后可从该文件记录的位置继续导出
+            kwargs: 传递给 `stream_villa_members` 的参数
+
+        返回:
+            int: 累计导出的成员数
+        """
+        return await export_villa_members(
+            self,
+            villa_id,
+            output,
+            checkpoint,
+            **kwargs,
+        )
+
     @API
     async def delete_villa_member(
         self,
@@ -651,6 +1070,44 @@ class Bot(BaseBot):
             json={"uid": uid},
         )
         await self._request(request)
+        if self._member_cache is not None:
+            self._member_cache.pop((villa_id, uid))
+        if (directory := self._member_directories.get(villa_id)) is not None:
+            directory.remove(uid)
+
+    async def delete_villa_members(
+        self,
+        villa_id: int,
+        uids: Iterable[int],
+        concurrency: int = 4,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[int, Optional[Exception]]:
+        """批量踢出用户
+
+        以有限的并发执行，遇到频率限制时自动退避重试，单个用户失败不影响其他用户。
+        取消调用时尚未完成的操作会一同取消
+
+        参数:
+            villa_id: 大别野 ID
+            uids: 用户 ID 列表
+            concurrency: 最大并发请求数
+            on_progress: 进度回调，参数为 (已完成数, 总数)
+
+        返回:
+            Dict[int, Optional[Exception]]: 用户 ID 到失败原因的映射，成功时为 None
+        """
+        targets = list(dict.fromkeys(uids))
+
+        async def _delete(uid: int) -> None:
+            await self.delete_villa_member(villa_id=villa_id, uid=uid)
+
+        results = await run_batch(
+            targets,
+            _delete,
+            concurrency,
+            on_progress=on_progress,
+        )
+        return dict(zip(targets, results))
 
     @API
     async def pin_message(
@@ -692,6 +1149,46 @@ class Bot(BaseBot):
         )
         await self._request(request)
 
+    async def recall_messages(
+        self,
+        villa_id: int,
+        messages: Iterable[Tuple[str, int, int]],
+        concurrency: int = 4,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Optional[Exception]]:
+        """批量撤回消息
+
+        以有限的并发执行，遇到频率限制时自动退避重试，单条消息失败不影响其他消息。
+        取消调用时尚未完成的操作会一同取消
+
+        参数:
+            villa_id: 大别野 ID
+            messages: (消息 ID, 房间 ID, 消息发送时间) 列表
+            concurrency: 最大并发请求数
+            on_progress: 进度回调，参数为 (已完成数, 总数)
+
+        返回:
+            Dict[str, Optional[Exception]]: 消息 ID 到失败原因的映射，成功时为 None
+        """
+        targets = list({message[0]: message for message in messages}.values())
+
+        async def _recall(message: Tuple[str, int, int]) -> None:
+            msg_uid, room_id, msg_time = message
+            await self.recall_message(
+                villa_id=villa_id,
+                msg_uid=msg_uid,
+                room_id=room_id,
+                msg_time=msg_time,
+            )
+
+        results = await run_batch(
+            targets,
+            _recall,
+            concurrency,
+            on_progress=on_progress,
+        )
+        return {message[0]: result for message, result in zip(targets, results)}
+
     @API
     async def send_message(
         self,
@@ -702,11 +1199,7 @@ class Bot(BaseBot):
         msg_content: Union[str, MessageContentInfo],
     ) -> str:
         if isinstance(msg_content, MessageContentInfo):
-            content = msg_content.json(
-                by_alias=True,
-                exclude_none=True,
-                ensure_ascii=False,
-            )
+            content = model_dumps(msg_content, by_alias=True, exclude_none=True)
         else:
             content = msg_content
         request = Request(
@@ -732,7 +1225,7 @@ class Bot(BaseBot):
             url=self.adapter.base_url / "createComponentTemplate",
             headers=self.get_authorization_header(),
             json={
-                "panel": panel.json(exclude_none=True, ensure_ascii=False),
+                "panel": model_dumps(panel, exclude_none=True),
             },
         )
         return (await self._request(request))["template_id"]
@@ -750,7 +1243,9 @@ class Bot(BaseBot):
             headers=self.get_authorization_header(villa_id),
             json={"group_name": group_name},
         )
-        return (await self._request(request))["group_id"]
+        group_id = (await self._request(request))["group_id"]
+        self._invalidate_room_tree(villa_id)
+        return group_id
 
     @API
     async def edit_group(
@@ -767,6 +1262,7 @@ class Bot(BaseBot):
             json={"group_id": group_id, "group_name": group_name},
         )
         await self._request(request)
+        self._invalidate_room_tree(villa_id)
 
     @API
     async def delete_group(
@@ -782,6 +1278,7 @@ class Bot(BaseBot):
             json={"group_id": group_id},
         )
         await self._request(request)
+        self._invalidate_room_tree(villa_id)
 
     @API
     async def get_group_list(self, *, villa_id: int) -> List[Group]:
@@ -790,7 +1287,7 @@ class Bot(BaseBot):
             url=self.adapter.base_url / "getGroupList",
             headers=self.get_authorization_header(villa_id),
         )
-        return parse_obj_as(List[Group], (await self._request(request))["list"])
+        return decode_group_list(await self._request(request))
 
     @API
     async def edit_room(
@@ -807,6 +1304,7 @@ class Bot(BaseBot):
             json={"room_id": room_id, "room_name": room_name},
         )
         await self._request(request)
+        self._invalidate_room_tree(villa_id)
 
     @API
     async def delete_room(
@@ -822,6 +1320,7 @@ class Bot(BaseBot):
             json={"room_id": room_id},
         )
         await self._request(request)
+        self._invalidate_room_tree(villa_id)
 
     @API
     async def get_room(
@@ -836,7 +1335,7 @@ class Bot(BaseBot):
             headers=self.get_authorization_header(villa_id),
             params={"room_id": room_id},
         )
-        return parse_obj_as(Room, (await self._request(request))["room"])
+        return decode_room(await self._request(request))
 
     @API
     async def get_villa_group_room_list(
@@ -849,10 +1348,39 @@ class Bot(BaseBot):
             url=self.adapter.base_url / "getVillaGroupRoomList",
             headers=self.get_authorization_header(villa_id),
         )
-        return parse_obj_as(
-            List[GroupRoom],
-            (await self._request(request))["list"],
-        )
+        return decode_group_room_list(await self._request(request))
+
+    async def get_room_tree(
+        self,
+        villa_id: int,
+        refresh: bool = False,
+    ) -> RoomTree:
+        """获取缓存的大别野分组-房间树
+
+        缓存超过 `room_cache_ttl` 后会先返回旧的结果并在后台刷新，
+        通过 Bot 创建、编辑、删除分组或房间后缓存立即失效
+
+        参数:
+            villa_id: 大别野 ID
+            refresh: 是否立即重新获取
+
+        返回:
+            RoomTree: 分组-房间树
+        """
+        if (cache := self._room_trees.get(villa_id)) is None:
+
+            async def _load() -> RoomTree:
+                with raw_response(False):
+                    groups = await self.get_villa_group_room_list(villa_id=villa_id)
+                return RoomTree(groups)
+
+            cache = AsyncCachedValue(_load, self._room_cache_ttl)
+            self._room_trees[villa_id] = cache
+        return await (cache.refresh() if refresh else cache.get())
+
+    def _invalidate_room_tree(self, villa_id: int) -> None:
+        if (cache := self._room_trees.get(villa_id)) is not None:
+            cache.invalidate()
 
     @API
     async def operate_member_to_role(
@@ -870,6 +1398,56 @@ class Bot(BaseBot):
             json={"role_id": role_id, "uid": uid, "is_add": is_add},
         )
         await self._request(request)
+        if self._member_cache is not None:
+            self._member_cache.pop((villa_id, uid))
+        if (directory := self._member_directories.get(villa_id)) is not None:
+            if is_add:
+                directory.add_role(uid, role_id)
+            else:
+                directory.remove_role(uid, role_id)
+
+    async def operate_members_to_role(
+        self,
+        villa_id: int,
+        role_id: int,
+        uids: Iterable[int],
+        is_add: bool,
+        concurrency: int = 4,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[int, Optional[Exception]]:
+        """批量向身份组操作用户
+
+        以有限的并发执行，遇到频率限制时自动退避重试，单个用户失败不影响其他用户。
+        取消调用时尚未完成的操作会一同取消
+
+        参数:
+            villa_id: 大别野 ID
+            role_id: 身份组 ID
+            uids: 用户 ID 列表
+            is_add: 是否添加到身份组，否则从身份组中移除
+            concurrency: 最大并发请求数
+            on_progress: 进度回调，参数为 (已完成数, 总数)
+
+        返回:
+            Dict[int, Optional[Exception]]: 用户 ID 到失败原因的映射，成功时为 None
+        """
+        targets = list(dict.fromkeys(uids))
+
+        async def _operate(uid: int) -> None:
+            await self.operate_member_to_role(
+                villa_id=villa_id,
+                role_id=role_id,
+                uid=uid,
+                is_add=is_add,
+            )
+
+        results = await run_batch(
+            targets,
+            _operate,
+            concurrency,
+            on_progress=on_progress,
+        )
+        return dict(zip(targets, results))
 
     @API
     async def create_member_role(
@@ -886,7 +1464,9 @@ class Bot(BaseBot):
             headers=self.get_authorization_header(villa_id),
             json={"name": name, "color": str(color), "permissions": permissions},
         )
-        return (await self._request(request))["id"]
+        role_id = (await self._request(request))["id"]
+        self._invalidate_roles(villa_id)
+        return role_id
 
     @API
     async def edit_member_role(
@@ -910,6 +1490,7 @@ class Bot(BaseBot):
             },
         )
         await self._request(request)
+        self._invalidate_roles(villa_id)
 
     @API
     async def delete_member_role(
@@ -925,6 +1506,11 @@ class Bot(BaseBot):
             json={"id": role_id},
         )
         await self._request(request)
+        self._invalidate_roles(villa_id)
+        if self._member_cache is not None:
+            self._member_cache.clear()
+        if (directory := self._member_directories.get(villa_id)) is not None:
+            directory.drop_role(role_id)
 
     @API
     async def get_member_role_info(
@@ -939,10 +1525,7 @@ class Bot(BaseBot):
             headers=self.get_authorization_header(villa_id),
             params={"role_id": role_id},
         )
-        return parse_obj_as(
-            MemberRole,
-            (await self._request(request))["role"],
-        )
+        return decode_member_role(await self._request(request))
 
     @API
     async def get_villa_member_roles(
@@ -955,10 +1538,7 @@ class Bot(BaseBot):
             url=self.adapter.base_url / "getVillaMemberRoles",
             headers=self.get_authorization_header(villa_id),
         )
-        return parse_obj_as(
-            List[MemberRole],
-            (await self._request(request))["list"],
-        )
+        return decode_member_role_list(await self._request(request))
 
     @API
     async def get_all_emoticons(self) -> List[Emoticon]:
@@ -967,7 +1547,25 @@ class Bot(BaseBot):
             url=self.adapter.base_url / "getAllEmoticons",
             headers=self.get_authorization_header(),
         )
-        return parse_obj_as(List[Emoticon], (await self._request(request))["list"])
+        return decode_emoticon_list(await self._request(request))
+
+    async def get_emoticon_catalog(self, refresh: bool = False) -> EmoticonCatalog:
+        """获取缓存的表情目录
+
+        首次调用时加载，超过 `emoticon_cache_ttl` 后会先返回旧的结果并在后台刷新
+
+        参数:
+            refresh: 是否立即重新获取
+
+        返回:
+            EmoticonCatalog: 表情目录
+        """
+        cache = self._emoticon_catalog
+        return await (cache.refresh() if refresh else cache.get())
+
+    async def _load_emoticon_catalog(self) -> EmoticonCatalog:
+        with raw_response(False):
+            return EmoticonCatalog(await self.get_all_emoticons())
 
     @API
     async def audit(
@@ -992,7 +1590,119 @@ class Bot(BaseBot):
                 "content_type": content_type,
             },
         )
-        return (await self._request(request))["audit_id"]
+        audit_id = (await self._request(request))["audit_id"]
+        if self._audit_cache is not None:
+            self._audit_cache.submitted(
+                audit_id,
+                audit_content_key(audit_content, content_type),
+            )
+        return audit_id
+
+    async def audit_and_wait(
+        self,
+        *,
+        villa_id: int,
+        audit_content: str,
+        pass_through: str,
+        room_id: int,
+        uid: int,
+        content_type: ContentType = ContentType.TEXT,
+        timeout: Optional[float] = 60,
+    ) -> AuditCallbackEvent:
+        """提交审核并等待审核结果回调事件
+
+        参数:
+            villa_id: 大别野 ID
+            audit_content: 待审核内容
+            pass_through: 透传数据
+            room_id: 房间 ID
+            uid: 用户 ID
+            content_type: 审核内容的类型
+            timeout: 等待结果的超时时间，单位为秒，为 None 时不超时
+
+        异常:
+            RuntimeError: 等待中的审核数已达上限
+            asyncio.TimeoutError: 等待超时
+
+        返回:
+            AuditCallbackEvent: 审核结果回调事件
+        """
+        waiter = self._audit_waiter
+        # 在提交审核前占用名额，避免并发调用同时通过上限检查
+        waiter.reserve()
+        try:
+            audit_id = await self.audit(
+                villa_id=villa_id,
+                audit_content=audit_content,
+                pass_through=pass_through,
+                room_id=room_id,
+                uid=uid,
+                content_type=content_type,
+            )
+            future = waiter.register(audit_id)
+            try:
+                return await asyncio.wait_for(future, timeout)
+            finally:
+                waiter.discard(audit_id)
+        finally:
+            waiter.release()
+
+    async def check_content(
+        self,
+        *,
+        villa_id: int,
+        audit_content: str,
+        pass_through: str,
+        room_id: int,
+        uid: int,
+        content_type: ContentType = ContentType.TEXT,
+        timeout: Optional[float] = 60,
+    ) -> AuditResult:
+        """先在本地预审核内容，必要时再提交审核并等待结果
+
+        文本命中 `audit_keywords` 时直接驳回；开启审核结果缓存时，
+        审核过的相同内容直接返回上次的结果；其余内容通过 `audit_and_wait` 审核
+
+        参数:
+            villa_id: 大别野 ID
+            audit_content: 待审核内容
+            pass_through: 透传数据
+            room_id: 房间 ID
+            uid: 用户 ID
+            content_type: 审核内容的类型
+            timeout: 等待结果的超时时间，单位为秒，为 None 时不超时
+
+        异常:
+            RuntimeError: 等待中的审核数已达上限
+            asyncio.TimeoutError: 等待超时
+
+        返回:
+            AuditResult: 审核结果
+        """
+        if (
+            content_type == ContentType.TEXT
+            and self.audit_keywords is not None
+            and self.audit_keywords.find(audit_content) is not None
+        ):
+            return AuditResult.Reject
+        key = audit_content_key(audit_content, content_type)
+        if (
+            self._audit_cache is not None
+            and (result := self._audit_cache.get(key)) is not None
+        ):
+            return result
+        event = await self.audit_and_wait(
+            villa_id=villa_id,
+            audit_content=audit_content,
+            pass_through=pass_through,
+            room_id=room_id,
+            uid=uid,
+            content_type=content_type,
+            timeout=timeout,
+        )
+        if self._audit_cache is not None:
+            self._audit_cache.set(key, event.audit_result)
+        return event.audit_result
 
     @API
     async def transfer_image(
@@ -1000,6 +1710,13 @@ class Bot(BaseBot):
         *,
         url: str,
     ) -> str:
+        if self._transfer_cache is not None and (
+            new_url := self._transfer_cache.get(url)
+        ):
+            return new_url
+        return await self._transfer_flight.do(url, lambda: self._transfer_image(url))
+
+    async def _transfer_image(self, url: str) -> str:
         request = Request(
             method="POST",
             url=self.adapter.base_url / "transferImage",
@@ -1008,7 +1725,10 @@ class Bot(BaseBot):
                 "url": url,
             },
         )
-        return (await self._request(request))["new_url"]
+        new_url: str = (await self._request(request))["new_url"]
+        if self._transfer_cache is not None:
+            self._transfer_cache.set(url, new_url)
+        return new_url
 
     @API
     async def get_upload_image_params(
@@ -1027,11 +1747,11 @@ class Bot(BaseBot):
                 "ext": ext,
             },
         )
-        return parse_obj_as(UploadImageParamsReturn, await self._request(request))
+        return decode_upload_image_params(await self._request(request))
 
     async def upload_image(
         self,
-        image: Union[bytes, BytesIO, Path],
+        image: ImageSource,
         ext: Optional[str] = None,
         villa_id: Optional[int] = None,
     ) -> ImageUploadResult:
@@ -1043,31 +1763,156 @@ class Bot(BaseBot):
             villa_id: 上传所在的大别野 ID，不传时使用测试别野 ID
 
         异常:
-            ValueError: 无法获取图片拓展名
+            ValueError: 无法获取图片拓展名或图片大小超出限制
 
         返回:
             ImageUploadResult: 上传结果
         """
-        if isinstance(image, Path):
-            image = image.read_bytes()
-        elif isinstance(image, BytesIO):
-            image = image.getvalue()
-        img_md5 = get_img_md5(image)
-        ext = ext or get_img_extenion(image)
-        if ext is None:
-            raise ValueError("cannot guess image extension")
-        upload_params = await self.get_upload_image_params(
-            md5=img_md5,
-            ext=ext,
-            villa_id=villa_id,
+        prepared = await prepare_image_async(image, ext)
+        return await self._upload_prepared_image(prepared, villa_id)
+
+    async def upload_image_segment(
+        self,
+        image: ImageSource,
+        ext: Optional[str] = None,
+        villa_id: Optional[int] = None,
+    ) -> ImageSegment:
+        """上传图片并构造图片消息段
+
+        图片的宽高从文件头中识别，大小取自图片内容，无需额外请求
+
+        参数:
+            image: 图片内容/路径
+            ext: 图片拓展，不填时自动判断
+            villa_id: 上传所在的大别野 ID，不传时使用测试别野 ID
+
+        异常:
+            ValueError: 无法获取图片拓展名或图片大小超出限制
+
+        返回:
+            ImageSegment: 图片消息段
+        """
+        prepared = await prepare_image_async(image, ext)
+        result = await self._upload_prepared_image(prepared, villa_id)
+        return MessageSegment.image(
+            result.url,
+            prepared.width,
+            prepared.height,
+            prepared.size,
         )
+
+    async def upload_images(
+        self,
+        images: Sequence[ImageSource],
+        villa_id: Optional[int] = None,
+        concurrency: int = 4,
+    ) -> List[Union[ImageUploadResult, Exception]]:
+        """并发上传多张图片
+
+        较大的图片在线程池中计算 md5，获取上传参数和上传图片时
+        最多同时进行 `concurrency` 个请求
+
+        参数:
+            images: 图片内容/路径列表
+            villa_id: 上传所在的大别野 ID，不传时使用测试别野 ID
+            concurrency: 最大并发请求数
+
+        返回:
+            List[Union[ImageUploadResult, Exception]]: 与输入顺序一致的上传结果，
+                上传失败的图片对应位置为异常对象
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _upload(image: ImageSource) -> ImageUploadResult:
+            prepared = await prepare_image_async(image)
+            return await self._upload_prepared_image(prepared, villa_id, semaphore)
+
+        results = await asyncio.gather(
+            *(_upload(image) for image in images),
+            return_exceptions=True,
+        )
+        for result in results:
+            if not isinstance(result, Exception) and isinstance(result, BaseException):
+                raise result
+        return cast(List[Union[ImageUploadResult, Exception]], results)
+
+    async def _upload_prepared_image(
+        self,
+        image: PreparedImage,
+        villa_id: Optional[int] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> ImageUploadResult:
+        if (cached := await self._get_cached_upload(image.md5, image.ext)) is not None:
+            return cached
+        semaphore = semaphore or asyncio.Semaphore()
+        with raw_response(False):
+            async with semaphore:
+                upload_params = await self.get_upload_image_params(
+                    md5=image.md5,
+                    ext=image.ext,
+                    villa_id=villa_id,
+                )
+            if image.size > upload_params.max_file_size:
+                raise ValueError(
+                    f"image size {image.size} exceeds the limit "
+                    f"{upload_params.max_file_size}",
+                )
+            async with semaphore:
+                if isinstance(image.source, Path):
+                    # 以文件对象上传，由驱动器分块读取并流式发送
+                    with image.source.open("rb") as f:
+                        result = await self._post_image(upload_params, f)
+                else:
+                    if isinstance(image.source, BytesIO):
+                        image.source.seek(0)
+                    result = await self._post_image(upload_params, image.source)
+        if self._upload_cache is not None:
+            self._upload_cache.set(image.md5, image.ext, result)
+        return result
+
+    async def _post_image(
+        self,
+        upload_params: UploadImageParamsReturn,
+        file: Union[bytes, IO[bytes]],
+    ) -> ImageUploadResult:
         request = Request(
             "POST",
             url=upload_params.params.host,
             data=upload_params.params.to_upload_data(),
-            files={"file": image},
+            files={"file": file},
         )
-        return parse_obj_as(ImageUploadResult, await self._request(request))
+        return decode_image_upload_result(await self._request(request))
+
+    async def _flush_caches(self) -> None:
+        """等待图片上传和转存结果缓存的持久化写入完成"""
+        for cache in (self._upload_cache, self._transfer_cache):
+            if cache is not None:
+                await cache.flush()
+
+    async def _get_cached_upload(
+        self,
+        img_md5: str,
+        ext: str,
+    ) -> Optional[ImageUploadResult]:
+        if self._upload_cache is None:
+            return None
+        if (cached := self._upload_cache.get(img_md5, ext)) is None:
+            return None
+        if self._upload_cache_validate and not await self._check_image_url(
+            cached.url,
+        ):
+            self._upload_cache.discard(img_md5, ext)
+            return None
+        log("DEBUG", f"Image {img_md5}.{ext} hit upload cache")
+        return cached
+
+    async def _check_image_url(self, url: str) -> bool:
+        """检查已上传的图片链接是否仍然有效"""
+        try:
+            resp = await self.adapter.request(Request("HEAD", url, timeout=5.0))
+        except Exception:
+            return False
+        return resp.status_code == 200
 
     async def get_websocket_info(
         self,
@@ -1077,7 +1922,7 @@ class Bot(BaseBot):
             url=self.adapter.base_url / "getWebsocketInfo",
             headers=self.get_authorization_header(),
         )
-        return parse_obj_as(WebsocketInfo, await self._request(request))
+        return decode_websocket_info(await self._request(request))
 
 
 def _parse_components(components: List[Component]) -> Optional[Panel]:
@@ -1145,3 +1990,115 @@ class VillaMemberIterator:
         self.offset_str = offset_str
         await asyncio.sleep(self.interval)
         return result
+
+
+class VillaMemberStream:
+    """预取下一页并自适应分页大小和请求间隔的大别野成员迭代器
+
+    请求成功时逐步增大分页大小、缩短请求间隔；
+    遇到频率限制时加倍请求间隔后重试，分页大小被拒绝时退回上次成功的大小。
+
+    `offset_str` 始终指向已返回的最后一页之后的位置，可用于断点续传。
+    按页迭代时请在 `async with` 中使用，提前退出迭代时会取消预取。
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        villa_id: int,
+        offset_str: str = "",
+        size: int = 10,
+        max_size: int = 100,
+        interval: float = 0.3,
+        min_interval: float = 0.05,
+        max_interval: float = 10.0,
+        max_retries: int = 5,
+    ) -> None:
+        self.bot = bot
+        self.villa_id = villa_id
+        self.offset_str = offset_str
+        self.size = size
+        self.max_size = max_size
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_retries = max_retries
+        self._good_size = 0
+        self._last_request = 0.0
+        self._finished = False
+        self._task: Optional["asyncio.Task[Tuple[List[Member], str]]"] = None
+
+    def __aiter__(self):
+        return self
+
+    async def __aenter__(self) -> "VillaMemberStream":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.aclose()
+
+    async def __anext__(self) -> List[Member]:
+        if self._task is None:
+            if self._finished:
+                raise StopAsyncIteration
+            self._task = asyncio.ensure_future(self._fetch(self.offset_str))
+        try:
+            result, offset_str = await self._task
+        finally:
+            self._task = None
+        if not result:
+            self._finished = True
+            raise StopAsyncIteration
+        self.offset_str = offset_str
+        if offset_str:
+            self._task = asyncio.ensure_future(self._fetch(offset_str))
+        else:
+            self._finished = True
+        return result
+
+    async def members(self) -> AsyncIterator[Member]:
+        """按成员迭代，迭代结束或中断时取消预取"""
+        try:
+            async for page in self:
+                for member in page:
+                    yield member
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """停止迭代并取消正在进行的预取"""
+        self._finished = True
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self._task
+            self._task = None
+
+    async def _fetch(self, offset_str: str) -> Tuple[List[Member], str]:
+        loop = asyncio.get_running_loop()
+        retries = 0
+        while True:
+            if (delay := self._last_request + self.interval - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            self._last_request = loop.time()
+            try:
+                result = await self.bot.get_villa_members(
+                    villa_id=self.villa_id,
+                    offset_str=offset_str,
+                    size=self.size,
+                )
+            except RateLimited:
+                retries += 1
+                if retries > self.max_retries:
+                    raise
+                self.interval = min(max(self.interval * 2, 0.1), self.max_interval)
+                continue
+            except InvalidRequest:
+                if not 0 < self._good_size < self.size:
+                    raise
+                self.size = self.max_size = self._good_size
+                continue
+            self._good_size = self.size
+            self.size = min(self.size * 2, self.max_size)
+            self.interval = max(self.interval * 0.8, self.min_interval)
+            return result
@@ -0,0 +1,362 @@
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
+
+from .codec import dumps, loads
+from .utils import log
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class LRUCache(Generic[K, V]):
+    """有容量上限的 LRU 缓存
+
+    参数:
+        maxsize: 最大缓存条目数
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @overload
+    def get(self, key: K) -> Optional[V]:
+        ...
+
+    @overload
+    def get(self, key: K, default: T) -> Union[V, T]:
+        ...
+
+    def get(self, key: K, default: Optional[T] = None) -> Union[V, T, None]:
+        try:
+            value = self._data[key]
+        except KeyError:
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        return self._data.pop(key, default)
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        return iter(self._data.items())
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class TTLCache(Generic[K, V]):
+    """条目会在一段时间后过期的 LRU 缓存
+
+    参数:
+        maxsize: 最大缓存条目数
+        ttl: 条目默认的存活时间，单位为秒
+        timer: 计时函数，需要持久化过期时间时可使用 `time.time`
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.timer = timer
+        self._data: LRUCache[K, Tuple[float, V]] = LRUCache(maxsize)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @overload
+    def get(self, key: K) -> Optional[V]:
+        ...
+
+    @overload
+    def get(self, key: K, default: T) -> Union[V, T]:
+        ...
+
+    def get(self, key: K, default: Optional[T] = None) -> Union[V, T, None]:
+        if (item := self._data.get(key)) is None:
+            return default
+        expires_at, value = item
+        if expires_at <= self.timer():
+            self._data.pop(key)
+            return default
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> float:
+        """写入条目
+
+        参数:
+            key: 键
+            value: 值
+            ttl: 存活时间，不填时使用默认值
+
+        返回:
+            float: 条目的过期时间
+        """
+        expires_at = self.timer() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        return expires_at
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        if (item := self._data.pop(key)) is None:
+            return default
+        return item[1]
+
+    def items(self) -> Iterator[Tuple[K, V, float]]:
+        """遍历未过期的条目，返回 (键, 值, 过期时间)"""
+        now = self.timer()
+        for key, (expires_at, value) in list(self._data.items()):
+            if expires_at > now:
+                yield key, value, expires_at
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class SingleFlight(Generic[K, V]):
+    """合并同一个键上的并发调用，同一时刻每个键只有一个调用在执行
+
+    发起调用的协程被取消时，调用仍会继续执行，不影响其他等待者
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[K, "asyncio.Task[V]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._calls
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        """执行调用，若该键已有调用在执行则等待其结果
+
+        参数:
+            key: 调用的键
+            func: 无参数的异步函数
+
+        返回:
+            V: 调用结果
+        """
+        if (task := self._calls.get(key)) is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: K, task: "asyncio.Task[V]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+
+class AsyncCachedValue(Generic[V]):
+    """异步加载的缓存值
+
+    首次获取或失效后获取时等待加载；超过 `ttl` 后获取时先返回旧值，
+    同时在后台刷新。并发的加载会被合并为一次。
+
+    参数:
+        loader: 加载值的无参数异步函数
+        ttl: 值的有效时间，单位为秒
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[V]], ttl: float) -> None:
+        self.ttl = ttl
+        self._loader = loader
+        self._value: Optional[V] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._flight: SingleFlight[int, V] = SingleFlight()
+
+    @property
+    def value(self) -> Optional[V]:
+        """当前缓存的值，可能已过期，未加载或已失效时为 None"""
+        return self._value
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.ttl
+
+    async def get(self) -> V:
+        if self._value is None:
+            return await self.refresh()
+        if self.expired:
+            self.refresh_in_background()
+        return self._value
+
+    async def refresh(self) -> V:
+        """立即重新加载"""
+        return await self._flight.do(self._generation, self._load)
+
+    def refresh_in_background(self) -> None:
+        if self._generation in self._flight:
+            return
+        task = asyncio.ensure_future(self.refresh())
+        task.add_done_callback(self._log_refresh_error)
+
+    def set(self, value: V) -> None:
+        self._generation += 1
+        self._value = value
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """使缓存失效，正在进行的加载结果将被丢弃"""
+        self._generation += 1
+        self._value = None
+
+    async def _load(self) -> V:
+        generation = self._generation
+        value = await self._loader()
+        if generation == self._generation:
+            self._value = value
+            self._loaded_at = time.monotonic()
+        return value
+
+    @staticmethod
+    def _log_refresh_error(task: "asyncio.Task[V]") -> None:
+        if not task.cancelled() and isinstance(e := task.exception(), Exception):
+            log("WARNING", "Error while refreshing cache in background", e)
+
+
+class JSONLinesStore:
+    """以 JSON Lines 格式追加写入的持久化键值存储
+
+    每次写入只追加一行，加载时后写入的记录覆盖先写入的记录，
+    当文件中的过期记录过多时自动压缩。
+    在事件循环中写入时，文件操作会合并后交给线程池执行，不阻塞事件循环，
+    可以调用 `flush` 等待写入完成。
+
+    参数:
+        path: 存储文件路径
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lines = 0
+        self._pending: List[Union[str, List[Tuple[str, Any]]]] = []
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+
+    def load(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        if not self.path.exists():
+            return data
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                self._lines += 1
+                try:
+                    record = loads(line)
+                except ValueError:
+                    continue
+                if record.get("v") is None:
+                    data.pop(record["k"], None)
+                else:
+                    data[record["k"]] = record["v"]
+        return data
+
+    def set(self, key: str, value: Any) -> None:
+        self._append({"k": key, "v": value})
+
+    def delete(self, key: str) -> None:
+        self._append({"k": key, "v": None})
+
+    def compact(self, data: Dict[str, Any]) -> None:
+        """使用给定的数据重写存储文件"""
+        self._lines = len(data)
+        self._schedule(list(data.items()))
+
+    def should_compact(self, size: int) -> bool:
+        return self._lines > 2 * size + 64
+
+    async def flush(self) -> None:
+        """等待已提交的写入完成"""
+        while self._flush_task is not None and not self._flush_task.done():
+            await asyncio.shield(self._flush_task)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        self._lines += 1
+        self._schedule(dumps(record) + "\n")
+
+    def _schedule(self, operation: Union[str, List[Tuple[str, Any]]]) -> None:
+        self._pending.append(operation)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._take_pending())
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush())
+
+    def _take_pending(self) -> List[Union[str, List[Tuple[str, Any]]]]:
+        operations, self._pending = self._pending, []
+        return operations
+
+    async def _flush(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            try:
+                await loop.run_in_executor(None, self._write, self._take_pending())
+            except OSError as e:
+                log("WARNING", f"Failed to write cache file {self.path}", e)
+
+    def _write(self, operations: List[Union[str, List[Tuple[str, Any]]]]) -> None:
+        # 重写文件之前追加的记录都已包含在重写的数据中，只需执行最后一次重写
+        rewrite: Optional[List[Tuple[str, Any]]] = None
+        lines: List[str] = []
+        for operation in operations:
+            if isinstance(operation, str):
+                lines.append(operation)
+            else:
+                rewrite, lines = operation, []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if rewrite is not None:
+            tmp_path = self.path.with_suffix(f"{self.path.suffix}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                for key, value in rewrite:
+                    f.write(dumps({"k": key, "v": value}) + "\n")
+                f.writelines(lines)
+            tmp_path.replace(self.path)
+        elif lines:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.writelines(lines)
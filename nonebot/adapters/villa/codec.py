@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+import json
+from typing import Any, Callable, Dict, Literal, Union
+
+from pydantic import BaseModel
+
+from .compat import model_dump, to_jsonable_python
+from .utils import log
+
+JSONBackend = Literal["auto", "json", "orjson", "msgspec"]
+
+
+@dataclass(frozen=True)
+class JSONCodec:
+    """JSON 编解码后端"""
+
+    name: str
+    loads: Callable[[Union[str, bytes]], Any]
+    dumps: Callable[[Any], str]
+
+
+def _json_codec() -> JSONCodec:
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, default=to_jsonable_python)
+
+    return JSONCodec("json", json.loads, dumps)
+
+
+def _orjson_codec() -> JSONCodec:
+    import orjson
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=to_jsonable_python).decode()
+
+    return JSONCodec("orjson", orjson.loads, dumps)
+
+
+def _msgspec_codec() -> JSONCodec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=to_jsonable_python)
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj: Any) -> str:
+        return encoder.encode(obj).decode()
+
+    return JSONCodec("msgspec", decoder.decode, dumps)
+
+
+_CODEC_FACTORIES: Dict[str, Callable[[], JSONCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _json_codec,
+}
+
+_codec: JSONCodec = _json_codec()
+
+
+def get_codec(backend: JSONBackend = "auto") -> JSONCodec:
+    """获取 JSON 编解码后端
+
+    参数:
+        backend: 后端名称，为 auto 时按 orjson、msgspec、json 的顺序选择已安装的后端
+
+    异常:
+        ImportError: 指定的后端未安装
+
+    返回:
+        JSONCodec: 编解码后端
+    """
+    if backend != "auto":
+        return _CODEC_FACTORIES[backend]()
+    for factory in _CODEC_FACTORIES.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return _json_codec()
+
+
+def set_json_backend(backend: JSONBackend = "auto") -> JSONCodec:
+    """设置适配器全局使用的 JSON 编解码后端
+
+    参数:
+        backend: 后端名称
+
+    返回:
+        JSONCodec: 生效的编解码后端
+    """
+    global _codec
+
+    _codec = get_codec(backend)
+    log("DEBUG", f"Using JSON backend <y>{_codec.name}</y>")
+    return _codec
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return _codec.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    return _codec.dumps(obj)
+
+
+def model_dumps(
+    model: BaseModel,
+    *,
+    by_alias: bool = False,
+    exclude_none: bool = False,
+) -> str:
+    """序列化 pydantic 模型，等价于 `model.json(...)`，但使用当前的 JSON 后端"""
+    return _codec.dumps(
+        model_dump(model, by_alias=by_alias, exclude_none=exclude_none),
+    )
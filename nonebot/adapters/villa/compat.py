@@ -0,0 +1,94 @@
+from typing import Any, Callable, Dict, Type, TypeVar
+
+from pydantic import VERSION, BaseModel
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+PYDANTIC_V2 = int(VERSION.split(".", 1)[0]) == 2
+
+if PYDANTIC_V2:
+    from pydantic import (
+        ConfigDict as ConfigDict,  # type: ignore
+        TypeAdapter,  # type: ignore
+        field_validator as _field_validator,  # type: ignore
+        model_validator as _model_validator,  # type: ignore
+    )
+    from pydantic_core import to_jsonable_python as to_jsonable_python  # type: ignore
+
+    def field_validator(field: str, *, pre: bool = False) -> Callable[[T], T]:  # type: ignore
+        return _field_validator(field, mode="before" if pre else "after")  # type: ignore
+
+    def model_validator(*, pre: bool = False) -> Callable[[T], T]:  # type: ignore
+        return _model_validator(mode="before" if pre else "after")  # type: ignore
+
+    def model_dump(
+        model: BaseModel,
+        *,
+        by_alias: bool = False,
+        exclude_none: bool = False,
+    ) -> Dict[str, Any]:
+        return model.model_dump(by_alias=by_alias, exclude_none=exclude_none)  # type: ignore
+
+    def model_validate(model_class: Type[M], data: Any) -> M:  # type: ignore
+        return model_class.model_validate(data)  # type: ignore
+
+    def model_rebuild(model_class: Type[BaseModel]) -> None:  # type: ignore
+        model_class.model_rebuild()  # type: ignore
+
+    def type_validator(type_: Type[T]) -> Callable[[Any], T]:  # type: ignore
+        """创建对指定类型的校验函数，校验器只会构建一次"""
+        return TypeAdapter(type_).validate_python
+
+else:
+    from pydantic import (
+        parse_obj_as,
+        root_validator as _root_validator,
+        validator as _validator,
+    )
+    from pydantic.json import pydantic_encoder as to_jsonable_python  # noqa: F401
+
+    ConfigDict = dict
+
+    def field_validator(field: str, *, pre: bool = False) -> Callable[[T], T]:
+        return _validator(field, pre=pre, allow_reuse=True)  # type: ignore
+
+    def model_validator(*, pre: bool = False) -> Callable[[T], T]:
+        return _root_validator(pre=pre, skip_on_failure=True, allow_reuse=True)  # type: ignore
+
+    def model_dump(
+        model: BaseModel,
+        *,
+        by_alias: bool = False,
+        exclude_none: bool = False,
+    ) -> Dict[str, Any]:
+        return model.dict(by_alias=by_alias, exclude_none=exclude_none)
+
+    def model_validate(model_class: Type[M], data: Any) -> M:
+        return model_class.parse_obj(data)
+
+    def model_rebuild(model_class: Type[BaseModel]) -> None:
+        model_class.update_forward_refs()
+
+    def type_validator(type_: Type[T]) -> Callable[[Any], T]:
+        """创建对指定类型的校验函数，校验器只会构建一次"""
+        return lambda data: parse_obj_as(type_, data)
+
+
+def type_validate_python(type_: Type[T], data: Any) -> T:
+    """将数据校验为指定类型"""
+    return type_validator(type_)(data)
+
+
+__all__ = [
+    "PYDANTIC_V2",
+    "ConfigDict",
+    "to_jsonable_python",
+    "field_validator",
+    "model_validator",
+    "model_dump",
+    "model_validate",
+    "model_rebuild",
+    "type_validator",
+    "type_validate_python",
+]
@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .cache import TTLCache
+from .event import ClickMsgComponentEvent
+from .models import Component, Panel
+from .utils import log
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+@dataclass
+class ComponentInteraction:
+    """一次组件点击交互
+
+    参数:
+        bot: 收到事件的 Bot
+        event: 组件点击事件
+        component: 发送消息时记录的组件，未记录时为 None
+        state: 该条消息的交互状态，同一条消息的所有点击共享
+    """
+
+    bot: "Bot"
+    event: ClickMsgComponentEvent
+    component: Optional[Component]
+    state: Dict[str, Any]
+
+
+ComponentHandler = Callable[[ComponentInteraction], Awaitable[Any]]
+H = TypeVar("H", bound=ComponentHandler)
+
+
+def _panel_components(panel: Panel) -> Iterable[Component]:
+    for group_list in (
+        panel.small_component_group_list,
+        panel.mid_component_group_list,
+        panel.big_component_group_list,
+    ):
+        for group in group_list or ():
+            yield from group
+
+
+class ComponentRouter:
+    """消息组件点击事件路由
+
+    按组件 ID 或组件 ID 前缀(组件 ID 中第一个 `separator` 之前的部分)注册回调，
+    收到 `ClickMsgComponentEvent` 时通过一次字典查找分发，不再经过事件响应器。
+    通过 Bot 发送的消息中的组件会被记录，回调时可以获取原组件和该消息的交互状态。
+
+    参数:
+        separator: 组件 ID 前缀的分隔符
+        ttl: 记录的组件和交互状态的有效时间，单位为秒
+        maxsize: 最多记录的组件数和交互状态数
+    """
+
+    def __init__(
+        self,
+        separator: str = ":",
+        ttl: float = 86400,
+        maxsize: int = 4096,
+    ) -> None:
+        self.separator = separator
+        self._handlers: Dict[str, ComponentHandler] = {}
+        self._prefix_handlers: Dict[str, ComponentHandler] = {}
+        self._components: TTLCache[Tuple[str, str], Component] = TTLCache(maxsize, ttl)
+        self._states: TTLCache[str, Dict[str, Any]] = TTLCache(maxsize, ttl)
+
+    def on(self, component_id: str) -> Callable[[H], H]:
+        """注册组件 ID 的回调
+
+        用法:
+            ```python
+            @component_router.on("confirm")
+            async def _(interaction: ComponentInteraction): ...
+            ```
+        """
+
+        def _decorator(handler: H) -> H:
+            self._handlers[component_id] = handler
+            return handler
+
+        return _decorator
+
+    def on_prefix(self, prefix: str) -> Callable[[H], H]:
+        """注册组件 ID 前缀的回调，如前缀 `vote` 匹配 `vote:1`、`vote:2`"""
+
+        def _decorator(handler: H) -> H:
+            self._prefix_handlers[prefix] = handler
+            return handler
+
+        return _decorator
+
+    def remove(self, component_id_or_prefix: str) -> None:
+        self._handlers.pop(component_id_or_prefix, None)
+        self._prefix_handlers.pop(component_id_or_prefix, None)
+
+    def get_handler(self, component_id: str) -> Optional[ComponentHandler]:
+        if (handler := self._handlers.get(component_id)) is not None:
+            return handler
+        prefix, sep, _ = component_id.partition(self.separator)
+        return self._prefix_handlers.get(prefix) if sep else None
+
+    def track(
+        self,
+        msg_id: str,
+        components: Iterable[Component] = (),
+        panel: Optional[Panel] = None,
+    ) -> None:
+        """记录已发送消息中的组件"""
+        if panel is not None:
+            components = (*components, *_panel_components(panel))
+        for component in components:
+            self._components[(msg_id, component.id)] = component
+
+    def state(self, msg_id: str) -> Dict[str, Any]:
+        """获取消息的交互状态，不存在时创建"""
+        if (state := self._states.get(msg_id)) is None:
+            state = {}
+            self._states[msg_id] = state
+        return state
+
+    async def dispatch(self, bot: "Bot", event: ClickMsgComponentEvent) -> bool:
+        """分发组件点击事件
+
+        返回:
+            bool: 是否有对应的回调处理了该事件
+        """
+        if (handler := self.get_handler(event.component_id)) is None:
+            return False
+        msg_id = event.bot_msg_id or event.msg_uid
+        interaction = ComponentInteraction(
+            bot,
+            event,
+            self._components.get((msg_id, event.component_id)),
+            self.state(msg_id),
+        )
+        try:
+            await handler(interaction)
+        except Exception as e:
+            log(
+                "ERROR",
+                f"Error while handling component {event.component_id!r} click",
+                e,
+            )
+        return True
+
+
+component_router = ComponentRouter()
+"""全局的消息组件点击事件路由"""
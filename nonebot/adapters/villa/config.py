@@ -1,6 +1,9 @@
+from pathlib import Path
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Extra, Field
+from pydantic import BaseModel, Field
+
+from .codec import JSONBackend
 
 
 class BotInfo(BaseModel):
@@ -11,7 +14,28 @@ class BotInfo(BaseModel):
     pub_key: str
     callback_url: Optional[str] = None
     verify_event: bool = True
+    content_cache_size: int = 0
+    nickname_cache_size: int = 2048
+    member_cache_size: int = 0
+    member_cache_ttl: float = 60
+    upload_cache_size: int = 0
+    upload_cache_path: Optional[Path] = None
+    upload_cache_validate: bool = False
+    transfer_cache_size: int = 0
+    transfer_cache_ttl: float = 86400
+    transfer_cache_path: Optional[Path] = None
+    room_cache_ttl: float = 300
+    emoticon_cache_ttl: float = 3600
+    villa_cache_ttl: float = 300
+    token_cache_size: int = 0
+    token_cache_ttl: float = 60
+    token_cache_negative_ttl: float = 10
+    max_pending_audits: int = 1024
+    audit_keywords: List[str] = Field(default_factory=list)
+    audit_cache_size: int = 0
+    audit_cache_ttl: float = 3600
 
 
-class Config(BaseModel, extra=Extra.ignore):
+class Config(BaseModel, extra="ignore"):
     villa_bots: List[BotInfo] = Field(default_factory=list)
+    villa_json_backend: JSONBackend = "auto"
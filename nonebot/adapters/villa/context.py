@@ -0,0 +1,104 @@
+import asyncio
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from .cache import AsyncCachedValue
+from .decoder import raw_response
+from .directory import MemberDirectory
+from .models import MemberRole, Villa
+from .roles import RoleIndex
+from .rooms import RoomTree
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class VillaContext:
+    """大别野上下文，缓存大别野信息和身份组快照，并持有成员目录和房间树缓存
+
+    缓存超过 `ttl` 后会先返回旧的结果并在后台刷新，
+    收到该大别野的事件时也会在后台刷新已过期的缓存
+
+    参数:
+        bot: 用于请求的 Bot
+        villa_id: 大别野 ID
+        ttl: 大别野信息和身份组快照的有效时间，单位为秒
+    """
+
+    def __init__(self, bot: "Bot", villa_id: int, ttl: float = 300) -> None:
+        self.bot = bot
+        self.villa_id = villa_id
+        self._villa = AsyncCachedValue(self._load_villa, ttl)
+        self._roles = AsyncCachedValue(self._load_roles, ttl)
+        self._role_index: Optional[RoleIndex] = None
+        self._role_index_source: Optional[List[MemberRole]] = None
+
+    @property
+    def villa(self) -> Optional[Villa]:
+        """已缓存的大别野信息，未加载时为 None"""
+        return self._villa.value
+
+    @property
+    def roles(self) -> Optional[List[MemberRole]]:
+        """已缓存的身份组快照，未加载时为 None"""
+        return self._roles.value
+
+    @property
+    def members(self) -> MemberDirectory:
+        """大别野的成员目录"""
+        return self.bot.member_directory(self.villa_id)
+
+    async def get_villa(self, refresh: bool = False) -> Villa:
+        return await (self._villa.refresh() if refresh else self._villa.get())
+
+    async def get_roles(self, refresh: bool = False) -> List[MemberRole]:
+        """获取大别野的身份组及其权限快照"""
+        return await (self._roles.refresh() if refresh else self._roles.get())
+
+    async def get_role_index(self, refresh: bool = False) -> RoleIndex:
+        """获取由身份组快照构建的身份组权限索引"""
+        roles = await self.get_roles(refresh)
+        if self._role_index is None or self._role_index_source is not roles:
+            self._role_index = RoleIndex(roles)
+            self._role_index_source = roles
+        return self._role_index
+
+    async def get_member_role_ids(self, uid: int) -> Sequence[int]:
+        """获取成员的身份组 ID，成员目录已同步时不再请求 API"""
+        if (entry := self.members.get(uid)) is not None:
+            return entry.role_ids
+        with raw_response(False):
+            member = await self.bot.get_member(villa_id=self.villa_id, uid=uid)
+        return member.role_id_list
+
+    async def get_room_tree(self, refresh: bool = False) -> RoomTree:
+        return await self.bot.get_room_tree(self.villa_id, refresh)
+
+    def refresh_in_background(self) -> None:
+        """在后台刷新已加载且过期的缓存"""
+        for cache in (self._villa, self._roles):
+            if cache.value is not None and cache.expired:
+                cache.refresh_in_background()
+
+    def invalidate_roles(self) -> None:
+        self._roles.invalidate()
+
+    async def _load_villa(self) -> Villa:
+        with raw_response(False):
+            return await self.bot.get_villa(villa_id=self.villa_id)
+
+    async def _load_roles(self) -> List[MemberRole]:
+        with raw_response(False):
+            roles = await self.bot.get_villa_member_roles(villa_id=self.villa_id)
+            missing = [i for i, role in enumerate(roles) if role.permissions is None]
+            details = await asyncio.gather(
+                *(
+                    self.bot.get_member_role_info(
+                        villa_id=self.villa_id,
+                        role_id=roles[i].id,
+                    )
+                    for i in missing
+                ),
+            )
+        for i, detail in zip(missing, details):
+            roles[i] = detail
+        return roles
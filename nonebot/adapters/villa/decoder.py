@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Generic, Iterator, List, Optional, Type, TypeVar
+
+from .compat import type_validator
+from .models import (
+    CheckMemberBotAccessTokenReturn,
+    Emoticon,
+    Group,
+    GroupRoom,
+    ImageUploadResult,
+    Member,
+    MemberRole,
+    Room,
+    UploadImageParamsReturn,
+    Villa,
+    WebsocketInfo,
+)
+
+T = TypeVar("T")
+
+_raw_response: ContextVar[bool] = ContextVar("_raw_response", default=False)
+
+
+@contextmanager
+def raw_response(enabled: bool = True) -> Iterator[None]:
+    """在该上下文中调用的 API 直接返回响应中的原始数据，不再解析为模型
+
+    只影响在该上下文中直接调用的查询 API；适配器内部使用结果的调用，
+    如上传图片、发送消息时获取房间名称、批量获取用户和同步成员目录等，始终解析为模型
+
+    参数:
+        enabled: 为 False 时在该上下文中恢复解析，用于内部缓存的加载
+
+    用法:
+        ```python
+        with raw_response():
+            rooms = await bot.get_villa_group_room_list(villa_id=villa_id)
+        ```
+    """
+    token = _raw_response.set(enabled)
+    try:
+        yield
+    finally:
+        _raw_response.reset(token)
+
+
+def is_raw_response() -> bool:
+    """当前上下文是否要求返回原始数据"""
+    return _raw_response.get()
+
+
+class ResponseDecoder(Generic[T]):
+    """API 响应数据解码器
+
+    从响应的 data 中取出指定字段，直接校验为目标类型，不再经过中间模型
+
+    参数:
+        type_: 目标类型
+        key: data 中的字段名，为 None 时使用整个 data
+    """
+
+    def __init__(self, type_: Type[T], key: Optional[str] = None) -> None:
+        self.type_ = type_
+        self.key = key
+        self._validate: Callable[[Any], T] = type_validator(type_)
+
+    def __call__(self, data: Any) -> T:
+        if self.key is not None:
+            data = data[self.key]
+        if _raw_response.get():
+            return data
+        return self._validate(data)
+
+
+decode_check_member_bot_access_token = ResponseDecoder(CheckMemberBotAccessTokenReturn)
+decode_villa = ResponseDecoder(Villa, "villa")
+decode_member = ResponseDecoder(Member, "member")
+decode_member_list = ResponseDecoder(List[Member], "list")
+decode_group_list = ResponseDecoder(List[Group], "list")
+decode_room = ResponseDecoder(Room, "room")
+decode_group_room_list = ResponseDecoder(List[GroupRoom], "list")
+decode_member_role = ResponseDecoder(MemberRole, "role")
+decode_member_role_list = ResponseDecoder(List[MemberRole], "list")
+decode_emoticon_list = ResponseDecoder(List[Emoticon], "list")
+decode_upload_image_params = ResponseDecoder(UploadImageParamsReturn)
+decode_image_upload_result = ResponseDecoder(ImageUploadResult)
+decode_websocket_info = ResponseDecoder(WebsocketInfo)
@@ -0,0 +1,284 @@
+from bisect import bisect_left, insort
+import sys
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .decoder import raw_response
+from .event import JoinVillaEvent
+from .models import Member
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class MemberEntry:
+    """成员目录中的成员条目，只保留建立索引所需的字段，不应直接修改
+
+    参数:
+        uid: 用户 ID
+        nickname: 用户昵称
+        avatar_url: 用户头像链接
+        joined_at: 加入大别野的时间戳
+        role_ids: 用户拥有的身份组 ID
+    """
+
+    __slots__ = ("uid", "nickname", "avatar_url", "joined_at", "role_ids")
+
+    def __init__(
+        self,
+        uid: int,
+        nickname: str,
+        avatar_url: str = "",
+        joined_at: int = 0,
+        role_ids: Tuple[int, ...] = (),
+    ) -> None:
+        self.uid = uid
+        self.nickname = nickname
+        self.avatar_url = avatar_url
+        self.joined_at = joined_at
+        self.role_ids = role_ids
+
+    def __repr__(self) -> str:
+        return (
+            f"MemberEntry(uid={self.uid!r}, nickname={self.nickname!r}, "
+            f"role_ids={self.role_ids!r})"
+        )
+
+    def with_roles(self, role_ids: Tuple[int, ...]) -> "MemberEntry":
+        return MemberEntry(
+            self.uid,
+            self.nickname,
+            self.avatar_url,
+            self.joined_at,
+            role_ids,
+        )
+
+    @classmethod
+    def from_member(cls, member: Member) -> "MemberEntry":
+        return cls(
+            member.basic.uid,
+            member.basic.nickname,
+            member.basic.avatar_url,
+            int(member.joined_at.timestamp()),
+            tuple(member.role_id_list),
+        )
+
+
+class _Indexes:
+    def __init__(self) -> None:
+        self.by_uid: Dict[int, MemberEntry] = {}
+        self.by_role: Dict[int, Set[int]] = {}
+        self.names: List[Tuple[str, int]] = []
+
+    def add(self, entry: MemberEntry) -> None:
+        self.remove(entry.uid)
+        self.by_uid[entry.uid] = entry
+        for role_id in entry.role_ids:
+            self.by_role.setdefault(role_id, set()).add(entry.uid)
+        insort(self.names, (entry.nickname.casefold(), entry.uid))
+
+    def remove(self, uid: int) -> Optional[MemberEntry]:
+        if (entry := self.by_uid.pop(uid, None)) is None:
+            return None
+        for role_id in entry.role_ids:
+            self._discard_role(role_id, uid)
+        key = (entry.nickname.casefold(), uid)
+        index = bisect_left(self.names, key)
+        if index < len(self.names) and self.names[index] == key:
+            del self.names[index]
+        return entry
+
+    def add_role(self, uid: int, role_id: int) -> None:
+        if (entry := self.by_uid.get(uid)) is None or role_id in entry.role_ids:
+            return
+        self.by_uid[uid] = entry.with_roles((*entry.role_ids, role_id))
+        self.by_role.setdefault(role_id, set()).add(uid)
+
+    def remove_role(self, uid: int, role_id: int) -> None:
+        if (entry := self.by_uid.get(uid)) is None or role_id not in entry.role_ids:
+            return
+        self.by_uid[uid] = entry.with_roles(
+            tuple(i for i in entry.role_ids if i != role_id),
+        )
+        self._discard_role(role_id, uid)
+
+    def drop_role(self, role_id: int) -> None:
+        for uid in self.by_role.pop(role_id, ()):
+            entry = self.by_uid[uid]
+            self.by_uid[uid] = entry.with_roles(
+                tuple(i for i in entry.role_ids if i != role_id),
+            )
+
+    def _discard_role(self, role_id: int, uid: int) -> None:
+        if (uids := self.by_role.get(role_id)) is not None:
+            uids.discard(uid)
+            if not uids:
+                del self.by_role[role_id]
+
+    @classmethod
+    def build(cls, entries: List[MemberEntry]) -> "_Indexes":
+        indexes = cls()
+        for entry in entries:
+            indexes.by_uid[entry.uid] = entry
+        for entry in indexes.by_uid.values():
+            for role_id in entry.role_ids:
+                indexes.by_role.setdefault(role_id, set()).add(entry.uid)
+        indexes.names = sorted(
+            (entry.nickname.casefold(), entry.uid) for entry in indexes.by_uid.values()
+        )
+        return indexes
+
+
+class MemberDirectory:
+    """带索引的大别野成员目录
+
+    调用 `sync` 完整同步一次成员列表后，
+    由 `JoinVillaEvent`、`Bot.delete_villa_member` 以及身份组相关 API 增量更新。
+    支持按用户 ID、昵称前缀(不区分大小写)和身份组 ID 查询。
+
+    参数:
+        bot: 用于同步的 Bot
+        villa_id: 大别野 ID
+    """
+
+    def __init__(self, bot: "Bot", villa_id: int) -> None:
+        self.bot = bot
+        self.villa_id = villa_id
+        self.synced_at: Optional[float] = None
+        """上次完整同步完成的时间戳"""
+        self._indexes = _Indexes()
+        self._pending: Optional[List[Callable[[_Indexes], Any]]] = None
+
+    def __len__(self) -> int:
+        return len(self._indexes.by_uid)
+
+    def __contains__(self, uid: int) -> bool:
+        return uid in self._indexes.by_uid
+
+    def __iter__(self) -> Iterator[MemberEntry]:
+        return iter(list(self._indexes.by_uid.values()))
+
+    @property
+    def synced(self) -> bool:
+        return self.synced_at is not None
+
+    async def sync(self, **kwargs) -> None:
+        """通过 `Bot.stream_villa_members` 完整同步成员列表
+
+        同步期间收到的增量更新会在同步完成后重放
+
+        参数:
+            kwargs: 传递给 `Bot.stream_villa_members` 的参数
+        """
+        self._pending = []
+        try:
+            stream = self.bot.stream_villa_members(self.villa_id, **kwargs)
+            with raw_response(False):
+                entries = [
+                    MemberEntry.from_member(member) async for member in stream.members()
+                ]
+            indexes = _Indexes.build(entries)
+            for operation in self._pending:
+                operation(indexes)
+            self._indexes = indexes
+            self.synced_at = time.time()
+        finally:
+            self._pending = None
+
+    def get(self, uid: int) -> Optional[MemberEntry]:
+        return self._indexes.by_uid.get(uid)
+
+    def find_by_nickname(
+        self,
+        prefix: str,
+        limit: Optional[int] = None,
+    ) -> List[MemberEntry]:
+        """按昵称前缀查找成员，不区分大小写
+
+        参数:
+            prefix: 昵称前缀
+            limit: 最多返回的成员数
+
+        返回:
+            List[MemberEntry]: 按昵称排序的成员列表
+        """
+        prefix = prefix.casefold()
+        names = self._indexes.names
+        result: List[MemberEntry] = []
+        for index in range(bisect_left(names, (prefix,)), len(names)):
+            name, uid = names[index]
+            if not name.startswith(prefix) or (
+                limit is not None and len(result) >= limit
+            ):
+                break
+            result.append(self._indexes.by_uid[uid])
+        return result
+
+    def with_role(self, role_id: int) -> List[MemberEntry]:
+        """获取拥有指定身份组的成员"""
+        by_uid = self._indexes.by_uid
+        return [by_uid[uid] for uid in self._indexes.by_role.get(role_id, ())]
+
+    def add(self, entry: MemberEntry) -> None:
+        self._apply(lambda indexes: indexes.add(entry))
+
+    def remove(self, uid: int) -> None:
+        self._apply(lambda indexes: indexes.remove(uid))
+
+    def add_role(self, uid: int, role_id: int) -> None:
+        self._apply(lambda indexes: indexes.add_role(uid, role_id))
+
+    def remove_role(self, uid: int, role_id: int) -> None:
+        self._apply(lambda indexes: indexes.remove_role(uid, role_id))
+
+    def drop_role(self, role_id: int) -> None:
+        self._apply(lambda indexes: indexes.drop_role(role_id))
+
+    def on_join(self, event: JoinVillaEvent) -> None:
+        self.add(
+            MemberEntry(event.join_uid, event.join_user_nickname, "", event.join_at),
+        )
+
+    def memory_usage(self) -> Dict[str, int]:
+        """估算目录占用的内存，单位为字节
+
+        返回:
+            Dict[str, int]: 各部分及总计占用的内存
+        """
+        indexes = self._indexes
+        entries = sum(
+            sys.getsizeof(entry)
+            + sys.getsizeof(entry.nickname)
+            + sys.getsizeof(entry.avatar_url)
+            + sys.getsizeof(entry.role_ids)
+            for entry in indexes.by_uid.values()
+        )
+        by_uid = sys.getsizeof(indexes.by_uid)
+        by_role = sys.getsizeof(indexes.by_role) + sum(
+            sys.getsizeof(uids) for uids in indexes.by_role.values()
+        )
+        names = sys.getsizeof(indexes.names) + sum(
+            sys.getsizeof(item) + sys.getsizeof(item[0]) for item in indexes.names
+        )
+        return {
+            "entries": entries,
+            "by_uid": by_uid,
+            "by_role": by_role,
+            "by_nickname": names,
+            "total": entries + by_uid + by_role + names,
+        }
+
+    def _apply(self, operation: Callable[[_Indexes], Any]) -> None:
+        operation(self._indexes)
+        if self._pending is not None:
+            self._pending.append(operation)
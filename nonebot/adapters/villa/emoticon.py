@@ -0,0 +1,47 @@
+from typing import Dict, Iterator, List, Optional
+
+from .models import Emoticon
+
+
+def _normalize_name(name: str) -> str:
+    if name.startswith("[") and name.endswith("]"):
+        return name[1:-1]
+    return name
+
+
+class EmoticonCatalog:
+    """表情目录，按表情 ID 和表情名称索引
+
+    参数:
+        emoticons: `Bot.get_all_emoticons` 的结果
+    """
+
+    def __init__(self, emoticons: List[Emoticon]) -> None:
+        self.by_id: Dict[int, Emoticon] = {
+            emoticon.emoticon_id: emoticon for emoticon in emoticons
+        }
+        self.by_name: Dict[str, Emoticon] = {
+            _normalize_name(emoticon.describe_text): emoticon for emoticon in emoticons
+        }
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, emoticon_id: int) -> bool:
+        return emoticon_id in self.by_id
+
+    def __iter__(self) -> Iterator[Emoticon]:
+        return iter(self.by_id.values())
+
+    def get(self, emoticon_id: int) -> Optional[Emoticon]:
+        return self.by_id.get(emoticon_id)
+
+    def find(self, name: str) -> Optional[Emoticon]:
+        """按表情名称查找表情，名称可带或不带方括号，如 `爱心` 或 `[爱心]`"""
+        return self.by_name.get(_normalize_name(name))
+
+    def name_of(self, emoticon_id: int) -> Optional[str]:
+        """获取表情名称"""
+        if (emoticon := self.by_id.get(emoticon_id)) is None:
+            return None
+        return emoticon.describe_text
@@ -1,14 +1,15 @@
 from datetime import datetime
 from enum import IntEnum
-import json
 from typing import Any, Dict, Literal, Optional, Union
 from typing_extensions import Annotated, override
 
 from nonebot.adapters import Event as BaseEvent
 from nonebot.utils import escape_tag
 
-from pydantic import Field, root_validator
+from pydantic import Field
 
+from .codec import loads
+from .compat import model_dump, model_validator
 from .message import Message, MessageSegment
 from .models import MessageContentInfoGet, QuoteMessage, Robot
 from .utils import pascal_to_snake
@@ -37,6 +38,24 @@ class AuditResult(IntEnum):
     """驳回"""
 
 
+def _flatten_event_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """将回调数据中 extend_data 内对应事件类型的数据展开到顶层"""
+    if "extend_data" not in data:
+        return data
+    extend_data = data.pop("extend_data")
+    event_type = data["type"] = EventType(data["type"])
+    event_name = event_type.name
+    event_data = extend_data.pop("EventData", extend_data)
+    if (
+        event_name in event_data
+        or (event_name := pascal_to_snake(event_name)) in event_data
+    ):
+        data.update(event_data[event_name])
+    else:
+        raise ValueError(f"Cannot find event data for event type: {event_name}")
+    return data
+
+
 class Event(BaseEvent):
     """Villa 事件基类"""
 
@@ -51,22 +70,12 @@ class Event(BaseEvent):
     send_at: int
     """事件回调时间"""
 
-    @root_validator(pre=True)
+    @model_validator(pre=True)
     @classmethod
-    def pre_handle(cls, data: Dict[str, Any]):
-        extend_data = data.pop("extend_data")
-        event_type = data["type"] = EventType(data["type"])
-        event_name = event_type.name
-        event_data = extend_data.pop("EventData", extend_data)
-        if (
-            event_name in event_data
-            or (event_name := pascal_to_snake(event_name)) in event_data
-        ):
-            data.update(event_data[event_name])
-        else:
-            raise ValueError(f"Cannot find event data for event type: {event_name}")
-
-        return data
+    def pre_handle(cls, data: Any):
+        if not isinstance(data, dict):
+            return data
+        return _flatten_event_data(data)
 
     @property
     def bot_id(self) -> str:
@@ -84,7 +93,7 @@ class Event(BaseEvent):
 
     @override
     def get_event_description(self) -> str:
-        return escape_tag(repr(self.dict()))
+        return escape_tag(repr(model_dump(self)))
 
     @override
     def get_message(self):
@@ -223,13 +232,17 @@ class SendMessageEvent(Event):
         """获取会话ID"""
         return f"{self.villa_id}_{self.room_id}_{self.from_user_id}"
 
-    @root_validator(pre=True)
+    @model_validator(pre=True)
     @classmethod
-    def payload_to_event(cls, data: Dict[str, Any]):
-        if not data.get("content"):
+    def payload_to_event(cls, data: Any):
+        if not isinstance(data, dict):
+            return data
+        # pydantic v2 中子类的前置校验器会先于父类执行，需要先展开事件数据
+        data = _flatten_event_data(data)
+        if not isinstance(data.get("content"), str):
             return data
         msg = Message()
-        msg_content_info = data["content"] = json.loads(data["content"])
+        msg_content_info = data["content"] = loads(data["content"])
         # if quote := msg_content_info.get("quote"):
         #     msg.append(
         #         MessageSegment.quote(
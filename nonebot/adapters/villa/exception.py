@@ -99,6 +99,11 @@ class UnsupportedMsgType(ActionFailed):
         super().__init__(10322006, response)
 
 
+class RateLimited(ActionFailed):
+    def __init__(self, response: "ApiResponse"):
+        super().__init__(429, response)
+
+
 class NetworkError(BaseNetworkError, VillaAdapterException):
     def __init__(self, msg: Optional[str] = None):
         super().__init__()
@@ -0,0 +1,103 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+from typing_extensions import Protocol
+
+from .codec import dumps, loads
+from .decoder import raw_response
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class AsyncWriter(Protocol):
+    async def write(self, data: bytes) -> Any:
+        ...
+
+
+def _load_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    try:
+        return loads(path.read_bytes())
+    except ValueError:
+        return None
+
+
+def _save_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+    tmp_path.write_text(dumps(checkpoint), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+async def export_villa_members(
+    bot: "Bot",
+    villa_id: int,
+    output: Union[Path, AsyncWriter],
+    checkpoint: Optional[Path] = None,
+    **kwargs: Any,
+) -> int:
+    """以 NDJSON 格式流式导出大别野成员，每行一个成员的原始数据
+
+    成员数据不会解析为模型，每写完一页即可释放。
+    指定 `checkpoint` 时每写完一页都会记录 `offset_str`，
+    中断后使用同一个 `checkpoint` 再次导出会从上次的位置继续，导出完成后删除该文件。
+
+    参数:
+        bot: 用于请求的 Bot
+        villa_id: 大别野 ID
+        output: 输出文件路径，或拥有异步 `write(bytes)` 方法的对象
+        checkpoint: 断点文件路径
+        kwargs: 传递给 `Bot.stream_villa_members` 的参数
+
+    返回:
+        int: 本次导出后累计导出的成员数
+    """
+    state = (_load_checkpoint(checkpoint) if checkpoint is not None else None) or {}
+    offset_str: str = state.get("offset_str", "")
+    count: int = state.get("count", 0)
+    position: Optional[int] = state.get("position")
+    if state and not offset_str:
+        if checkpoint is not None:
+            checkpoint.unlink(missing_ok=True)
+        return count
+
+    file = None
+    if isinstance(output, Path):
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if position is not None and output.exists():
+            file = output.open("r+b")
+            file.truncate(position)
+            file.seek(position)
+        else:
+            file = output.open("wb")
+            count = 0
+            offset_str = ""
+
+    stream = bot.stream_villa_members(villa_id, offset_str=offset_str, **kwargs)
+    try:
+        with raw_response():
+            async with stream:
+                async for page in stream:
+                    data = "".join(f"{dumps(member)}\n" for member in page).encode()
+                    if file is not None:
+                        file.write(data)
+                        file.flush()
+                    else:
+                        await output.write(data)  # type: ignore
+                    count += len(page)
+                    if checkpoint is not None:
+                        _save_checkpoint(
+                            checkpoint,
+                            {
+                                "offset_str": stream.offset_str,
+                                "count": count,
+                                "position": file.tell() if file else None,
+                            },
+                        )
+    finally:
+        if file is not None:
+            file.close()
+    if checkpoint is not None:
+        checkpoint.unlink(missing_ok=True)
+    return count
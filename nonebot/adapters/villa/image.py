@@ -0,0 +1,216 @@
+import asyncio
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+import time
+from typing import Optional, Union
+
+from .cache import JSONLinesStore, LRUCache, TTLCache
+from .compat import model_dump, model_validate
+from .models import ImageUploadResult
+from .utils import get_file_md5, get_img_md5, read_file_header, sniff_image
+
+ImageSource = Union[bytes, BytesIO, Path]
+
+IMAGE_HEADER_SIZE = 64 * 1024
+"""识别图片格式和尺寸时读取的文件头大小"""
+EXECUTOR_THRESHOLD = 256 * 1024
+"""超过该大小的内存图片在线程池中计算 md5"""
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """已计算好 md5 和拓展名、等待上传的图片"""
+
+    source: ImageSource
+    md5: str
+    ext: str
+    size: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+def prepare_image(image: ImageSource, ext: Optional[str] = None) -> PreparedImage:
+    """计算图片的 md5、大小并识别拓展名
+
+    读取文件时只会分块读取，可以放在线程池中执行
+
+    参数:
+        image: 图片内容/路径
+        ext: 图片拓展，不填时自动判断
+
+    异常:
+        ValueError: 无法获取图片拓展名
+
+    返回:
+        PreparedImage: 待上传的图片
+    """
+    if isinstance(image, Path):
+        img_md5 = get_file_md5(image)
+        size = image.stat().st_size
+        header = read_file_header(image, IMAGE_HEADER_SIZE)
+    elif isinstance(image, BytesIO):
+        with image.getbuffer() as buffer:
+            img_md5 = get_img_md5(buffer)
+            size = buffer.nbytes
+            header = bytes(buffer[:IMAGE_HEADER_SIZE])
+    else:
+        img_md5 = get_img_md5(image)
+        size = len(image)
+        header = image[:IMAGE_HEADER_SIZE]
+    info = sniff_image(header)
+    if ext is None:
+        if info is None:
+            raise ValueError("cannot guess image extension")
+        ext = info.ext
+    if info is None:
+        return PreparedImage(image, img_md5, ext, size)
+    return PreparedImage(image, img_md5, ext, size, info.width, info.height)
+
+
+def _image_size(image: ImageSource) -> int:
+    if isinstance(image, BytesIO):
+        with image.getbuffer() as buffer:
+            return buffer.nbytes
+    if isinstance(image, Path):
+        return image.stat().st_size
+    return len(image)
+
+
+async def prepare_image_async(
+    image: ImageSource,
+    ext: Optional[str] = None,
+) -> PreparedImage:
+    """异步地准备图片，文件以及超过 `EXECUTOR_THRESHOLD` 的图片会在线程池中处理
+
+    参数:
+        image: 图片内容/路径
+        ext: 图片拓展，不填时自动判断
+
+    异常:
+        ValueError: 无法获取图片拓展名
+
+    返回:
+        PreparedImage: 待上传的图片
+    """
+    if not isinstance(image, Path) and _image_size(image) <= EXECUTOR_THRESHOLD:
+        return prepare_image(image, ext)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, prepare_image, image, ext)
+
+
+class ImageUploadCache:
+    """图片上传结果缓存，以图片的 (md5, 拓展名) 为键
+
+    参数:
+        maxsize: 内存中最多缓存的条目数
+        path: 持久化存储文件路径，不填时只缓存在内存中
+    """
+
+    def __init__(self, maxsize: int = 1024, path: Optional[Path] = None) -> None:
+        self._memory: LRUCache[str, ImageUploadResult] = LRUCache(maxsize)
+        self._store = JSONLinesStore(path) if path is not None else None
+        if self._store is not None:
+            for key, value in self._store.load().items():
+                self._memory[key] = model_validate(ImageUploadResult, value)
+
+    @staticmethod
+    def _key(md5: str, ext: str) -> str:
+        return f"{md5}.{ext.lower()}"
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, md5: str, ext: str) -> Optional[ImageUploadResult]:
+        return self._memory.get(self._key(md5, ext))
+
+    def set(self, md5: str, ext: str, result: ImageUploadResult) -> None:
+        key = self._key(md5, ext)
+        self._memory[key] = result
+        if self._store is not None:
+            self._store.set(key, model_dump(result))
+            self._compact_if_needed()
+
+    def discard(self, md5: str, ext: str) -> None:
+        key = self._key(md5, ext)
+        if self._memory.pop(key) is not None and self._store is not None:
+            self._store.delete(key)
+            self._compact_if_needed()
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._store is not None:
+            self._store.compact({})
+
+    async def flush(self) -> None:
+        """等待持久化写入完成"""
+        if self._store is not None:
+            await self._store.flush()
+
+    def _compact_if_needed(self) -> None:
+        if self._store is not None and self._store.should_compact(len(self._memory)):
+            self._store.compact(
+                {key: model_dump(value) for key, value in self._memory.items()},
+            )
+
+
+class TransferImageCache:
+    """图片转存结果缓存，以原图片 url 为键，值为转存后的官方图床 url
+
+    过期时间使用系统时间记录，可以在重启后继续使用持久化的结果
+
+    参数:
+        maxsize: 内存中最多缓存的条目数
+        ttl: 转存结果的有效时间，单位为秒
+        path: 持久化存储文件路径，不填时只缓存在内存中
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 86400,
+        path: Optional[Path] = None,
+    ) -> None:
+        self._memory: TTLCache[str, str] = TTLCache(maxsize, ttl, timer=time.time)
+        self._store = JSONLinesStore(path) if path is not None else None
+        if self._store is not None:
+            now = time.time()
+            for key, value in self._store.load().items():
+                if value["expires_at"] > now:
+                    self._memory.set(key, value["new_url"], value["expires_at"] - now)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, url: str) -> Optional[str]:
+        return self._memory.get(url)
+
+    def set(self, url: str, new_url: str) -> None:
+        expires_at = self._memory.set(url, new_url)
+        if self._store is not None:
+            self._store.set(url, {"new_url": new_url, "expires_at": expires_at})
+            self._compact_if_needed()
+
+    def discard(self, url: str) -> None:
+        if self._memory.pop(url) is not None and self._store is not None:
+            self._store.delete(url)
+            self._compact_if_needed()
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._store is not None:
+            self._store.compact({})
+
+    async def flush(self) -> None:
+        """等待持久化写入完成"""
+        if self._store is not None:
+            await self._store.flush()
+
+    def _compact_if_needed(self) -> None:
+        if self._store is not None and self._store.should_compact(len(self._memory)):
+            self._store.compact(
+                {
+                    key: {"new_url": value, "expires_at": expires_at}
+                    for key, value, expires_at in self._memory.items()
+                },
+            )
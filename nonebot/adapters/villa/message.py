@@ -1,5 +1,22 @@
+from copy import deepcopy
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Iterable, List, Literal, Optional, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from typing_extensions import Self, TypedDict, override
 
 from nonebot.adapters import (
@@ -7,11 +24,15 @@ from nonebot.adapters import (
     MessageSegment as BaseMessageSegment,
 )
 
+from pydantic import BaseModel
+
+from .compat import model_validate
 from .models import (
     Badge,
     Component,
     Image,
     ImageMessageContent,
+    ImageSize,
     Link,
     MentionedAll,
     MentionedRobot,
@@ -240,7 +261,8 @@ class MessageSegment(BaseMessageSegment["Message"]):
         return ImageSegment(
             "image",
             {
-                "image": Image.parse_obj(
+                "image": model_validate(
+                    Image,
                     {
                         "url": url,
                         "size": {
@@ -552,6 +574,441 @@ class PanelSegment(MessageSegment):
         return f"<panel:{self.data['panel']}>"
 
 
+class _DataView(MutableMapping[str, Any]):
+    """紧凑消息段的 data 视图，读写会直接映射到消息段的属性上"""
+
+    __slots__ = ("_segment",)
+
+    def __init__(self, segment: "_CompactSegment") -> None:
+        self._segment = segment
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._segment._data_keys:
+            raise KeyError(key)
+        return self._segment._get_data(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._segment._data_keys:
+            raise KeyError(key)
+        self._segment._set_data(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("cannot delete key from compact segment data")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._segment._data_keys)
+
+    def __len__(self) -> int:
+        return len(self._segment._data_keys)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return deepcopy(dict(self), memo)
+
+
+class _CompactSegment:
+    """紧凑消息段基类
+
+    数据以类型化属性保存，代替 data 字典和其中的 pydantic 模型。
+    访问 `data` 时返回惰性视图，其中的模型在读取时才会构造，
+    每次读取得到的都是新的模型，修改模型后需要通过 `data[key] = model` 写回。
+    """
+
+    __slots__ = ()
+
+    _type: ClassVar[str]
+    _data_keys: ClassVar[Tuple[str, ...]]
+
+    @property
+    def type(self) -> str:
+        return self._type
+
+    @property
+    def data(self) -> MutableMapping[str, Any]:
+        return _DataView(self)
+
+    @data.setter
+    def data(self, value: Dict[str, Any]) -> None:
+        for key, item in value.items():
+            self._set_data(key, item)
+
+    def _get_data(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def _set_data(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MessageSegment):
+            return NotImplemented
+        return self.type == other.type and dict(self.data) == dict(other.data)
+
+    __hash__ = None  # type: ignore
+
+
+class CompactTextSegment(_CompactSegment, TextSegment):
+    __slots__ = ("content", "bold", "italic", "strikethrough", "underline")
+
+    _type = "text"
+    _data_keys = ("text", "bold", "italic", "strikethrough", "underline")
+
+    def __init__(
+        self,
+        content: str,
+        bold: bool = False,
+        italic: bool = False,
+        strikethrough: bool = False,
+        underline: bool = False,
+    ) -> None:
+        self.content = content
+        self.bold = bold
+        self.italic = italic
+        self.strikethrough = strikethrough
+        self.underline = underline
+
+    @override
+    def _get_data(self, key: str) -> Any:
+        return self.content if key == "text" else getattr(self, key)
+
+    @override
+    def _set_data(self, key: str, value: Any) -> None:
+        setattr(self, "content" if key == "text" else key, value)
+
+    @override
+    def __str__(self) -> str:
+        return self.content
+
+    @classmethod
+    def from_segment(cls, segment: TextSegment) -> Self:
+        data = segment.data
+        return cls(
+            data["text"],
+            data["bold"],
+            data["italic"],
+            data["strikethrough"],
+            data["underline"],
+        )
+
+
+class CompactMentionRobotSegement(_CompactSegment, MentionRobotSegement):
+    __slots__ = ("bot_id", "bot_name")
+
+    _type = "mention_robot"
+    _data_keys = ("mention_robot",)
+
+    def __init__(self, bot_id: str, bot_name: str) -> None:
+        self.bot_id = bot_id
+        self.bot_name = bot_name
+
+    @override
+    def _get_data(self, key: str) -> Any:
+        return MentionedRobot(bot_id=self.bot_id, bot_name=self.bot_name)
+
+    @override
+    def _set_data(self, key: str, value: MentionedRobot) -> None:
+        self.bot_id = value.bot_id
+        self.bot_name = value.bot_name
+
+    @override
+    def __str__(self) -> str:
+        return f"<mention_robot:{self.bot_id}>"
+
+    @classmethod
+    def from_segment(cls, segment: MentionRobotSegement) -> Self:
+        mention_robot = segment.data["mention_robot"]
+        return cls(mention_robot.bot_id, mention_robot.bot_name)
+
+
+class CompactMentionUserSegement(_CompactSegment, MentionUserSegement):
+    __slots__ = ("user_id", "user_name", "villa_id")
+
+    _type = "mention_user"
+    _data_keys = ("mention_user", "villa_id")
+
+    def __init__(
+        self,
+        user_id: str,
+        user_name: Optional[str] = None,
+        villa_id: Optional[int] = None,
+    ) -> None:
+        self.user_id = user_id
+        self.user_name = user_name
+        self.villa_id = villa_id
+
+    @override
+    def _get_data(self, key: str) -> Any:
+        if key == "villa_id":
+            return self.villa_id
+        return MentionedUser(user_id=self.user_id, user_name=self.user_name)
+
+    @override
+    def _set_data(self, key: str, value: Any) -> None:
+        if key == "villa_id":
+            self.villa_id = value
+        else:
+            self.user_id = value.user_id
+            self.user_name = value.user_name
+
+    @override
+    def __str__(self) -> str:
+        return f"<mention_user:{self.user_id}>"
+
+    @classmethod
+    def from_segment(cls, segment: MentionUserSegement) -> Self:
+        mention_user = segment.data["mention_user"]
+        return cls(
+            mention_user.user_id,
+            mention_user.user_name,
+            segment.data["villa_id"],
+        )
+
+
+class CompactMentionAllSegement(_CompactSegment, MentionAllSegement):
+    __slots__ = ("show_text",)
+
+    _type = "mention_all"
+    _data_keys = ("mention_all",)
+
+    def __init__(self, show_text: str = "全体成员") -> None:
+        self.show_text = show_text
+
+    @override
+    def _get_data(self, key: str) -> Any:
+        return MentionedAll(show_text=self.show_text)
+
+    @override
+    def _set_data(self, key: str, value: MentionedAll) -> None:
+        self.show_text = value.show_text
+
+    @override
+    def __str__(self) -> str:
+        return f"<mention_all:{self.show_text}>"
+
+    @classmethod
+    def from_segment(cls, segment: MentionAllSegement) -> Self:
+        return cls(segment.data["mention_all"].show_text)
+
+
+class CompactRoomLinkSegment(_CompactSegment, RoomLinkSegment):
+    __slots__ = ("villa_id", "room_id", "room_name")
+
+    _type = "room_link"
+    _data_keys = ("room_link",)
+
+    def __init__(
+        self,
+        villa_id: str,
+        room_id: str,
+        room_name: Optional[str] = None,
+    ) -> None:
+        self.villa_id = villa_id
+        self.room_id = room_id
+        self.room_name = room_name
+
+    @override
+    def _get_data(self, key: str) -> Any:
+        return VillaRoomLink(
+            villa_id=self.villa_id,
+            room_id=self.room_id,
+            room_name=self.room_name,
+        )
+
+    @override
+    def _set_data(self, key: str, value: VillaRoomLink) -> None:
+        self.villa_id = value.villa_id
+        self.room_id = value.room_id
+        self.room_name = value.room_name
+
+    @override
+    def __str__(self) -> str:
+        return f"<room_link:{self.room_id}>"
+
+    @classmethod
+    def from_segment(cls, segment: RoomLinkSegment) -> Self:
+        room_link = segment.data["room_link"]
+        return cls(room_link.villa_id, room_link.room_id, room_link.room_name)
+
+
+class CompactLinkSegment(_CompactSegment, LinkSegment):
+    __slots__ = ("url", "show_text", "requires_bot_access_token")
+
+    _type = "link"
+    _data_keys = ("link",)
+
+    def __init__(
+        self,
+        url: str,
+        show_text: str,
+        requires_bot_access_token: bool = False,
+    ) -> None:
+        self.url = url
+        self.show_text = show_text
+        self.requires_bot_access_token = requires_bot_access_token
+
+    @override
+    def _get_data(self, key: str) -> Any:
+        return Link(
+            url=self.url,
+            show_text=self.show_text,
+            requires_bot_access_token=self.requires_bot_access_token,
+        )
+
+    @override
+    def _set_data(self, key: str, value: Link) -> None:
+        self.url = value.url
+        self.show_text = value.show_text
+        self.requires_bot_access_token = value.requires_bot_access_token
+
+    @override
+    def __str__(self) -> str:
+        return f"<link:{self.url}>"
+
+    @classmethod
+    def from_segment(cls, segment: LinkSegment) -> Self:
+        link = segment.data["link"]
+        return cls(link.url, link.show_text, link.requires_bot_access_token)
+
+
+class CompactImageSegment(_CompactSegment, ImageSegment):
+    __slots__ = ("url", "width", "height", "file_size")
+
+    _type = "image"
+    _data_keys = ("image",)
+
+    def __init__(
+        self,
+        url: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        file_size: Optional[int] = None,
+    ) -> None:
+        self.url = url
+        self.width = width
+        self.height = height
+        self.file_size = file_size
+
+    @override
+    def _get_data(self, key: str) -> Any:
+        return Image(
+            url=self.url,
+            size=ImageSize(width=self.width, height=self.height),
+            file_size=self.file_size,
+        )
+
+    @override
+    def _set_data(self, key: str, value: Image) -> None:
+        self.url = value.url
+        self.width = value.size.width
+        self.height = value.size.height
+        self.file_size = value.file_size
+
+    @override
+    def __str__(self) -> str:
+        return f"<image:{self.url}>"
+
+    @classmethod
+    def from_segment(cls, segment: ImageSegment) -> Self:
+        image = segment.data["image"]
+        return cls(image.url, image.size.width, image.size.height, image.file_size)
+
+
+class CompactQuoteSegment(_CompactSegment, QuoteSegment):
+    __slots__ = (
+        "quoted_message_id",
+        "quoted_message_send_time",
+        "original_message_id",
+        "original_message_send_time",
+    )
+
+    _type = "quote"
+    _data_keys = ("quote",)
+
+    def __init__(
+        self,
+        quoted_message_id: str,
+        quoted_message_send_time: int,
+        original_message_id: Optional[str] = None,
+        original_message_send_time: Optional[int] = None,
+    ) -> None:
+        self.quoted_message_id = quoted_message_id
+        self.quoted_message_send_time = quoted_message_send_time
+        self.original_message_id = original_message_id or quoted_message_id
+        self.original_message_send_time = (
+            original_message_send_time or quoted_message_send_time
+        )
+
+    @override
+    def _get_data(self, key: str) -> Any:
+        return QuoteInfo(
+            quoted_message_id=self.quoted_message_id,
+            quoted_message_send_time=self.quoted_message_send_time,
+            original_message_id=self.original_message_id,
+            original_message_send_time=self.original_message_send_time,
+        )
+
+    @override
+    def _set_data(self, key: str, value: QuoteInfo) -> None:
+        self.quoted_message_id = value.quoted_message_id
+        self.quoted_message_send_time = value.quoted_message_send_time
+        self.original_message_id = value.original_message_id
+        self.original_message_send_time = value.original_message_send_time
+
+    @override
+    def __str__(self) -> str:
+        return f"<quote:{self.quoted_message_id}>"
+
+    @classmethod
+    def from_segment(cls, segment: QuoteSegment) -> Self:
+        quote = segment.data["quote"]
+        return cls(
+            quote.quoted_message_id,
+            quote.quoted_message_send_time,
+            quote.original_message_id,
+            quote.original_message_send_time,
+        )
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, BaseModel):
+        return (value.__class__, _freeze(value.__dict__))
+    if isinstance(value, Mapping):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+_COMPACT_SEGMENT_CLASSES: Dict[str, Any] = {
+    "text": CompactTextSegment,
+    "mention_robot": CompactMentionRobotSegement,
+    "mention_user": CompactMentionUserSegement,
+    "mention_all": CompactMentionAllSegement,
+    "room_link": CompactRoomLinkSegment,
+    "link": CompactLinkSegment,
+    "image": CompactImageSegment,
+    "quote": CompactQuoteSegment,
+}
+
+
+def compact_segment(segment: MessageSegment) -> MessageSegment:
+    """将消息段转换为紧凑表示，不支持的消息段类型原样返回
+
+    参数:
+        segment: 消息段
+
+    返回:
+        MessageSegment: 紧凑消息段
+    """
+    if isinstance(segment, _CompactSegment):
+        return segment
+    compact_class = _COMPACT_SEGMENT_CLASSES.get(segment.type)
+    if compact_class is None:
+        return segment
+    return compact_class.from_segment(segment)
+
+
 class Message(BaseMessage[MessageSegment]):
     @classmethod
     @override
@@ -581,6 +1038,33 @@ class Message(BaseMessage[MessageSegment]):
     def _construct(msg: str) -> Iterable[MessageSegment]:
         yield MessageSegment.text(msg)
 
+    def compact(self) -> Self:
+        """返回使用紧凑消息段表示的消息副本，适合长期保存大量历史消息
+
+        返回:
+            Message: 紧凑消息
+        """
+        return self.__class__(compact_segment(seg) for seg in self)
+
+    def fingerprint(self) -> Optional[Hashable]:
+        """消息内容指纹，内容相同的消息指纹相同，可作为缓存键
+
+        含有未填写名称的@用户或房间链接消息段时，发送结果依赖 API 查询，返回 None
+
+        返回:
+            Optional[Hashable]: 消息指纹
+        """
+        for seg in self:
+            if (
+                isinstance(seg, MentionUserSegement)
+                and seg.data["mention_user"].user_name is None
+            ) or (
+                isinstance(seg, RoomLinkSegment)
+                and seg.data["room_link"].room_name is None
+            ):
+                return None
+        return tuple((seg.type, _freeze(seg.data)) for seg in self)
+
     @classmethod
     def from_message_content_info(cls, content_info: MessageContentInfo) -> Self:
         msg = cls()
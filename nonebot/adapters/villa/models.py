@@ -1,22 +1,27 @@
 from datetime import datetime
 from enum import Enum, IntEnum
 import inspect
-import json
 import sys
 from typing import Any, Dict, List, Literal, Optional, Union
 from typing_extensions import TypeAlias
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field
+
+from .codec import loads
+from .compat import PYDANTIC_V2, ConfigDict, field_validator, model_rebuild
 
 
 class ApiResponse(BaseModel):
     retcode: int
-    message: str = ""
-    data: Any
+    message: str = Field(default="", alias="msg")
+    data: Any = None
+
+    if PYDANTIC_V2:
+        model_config = ConfigDict(populate_by_name=True)
+    else:
 
-    class Config:
-        allow_population_by_field_name = True
-        fields = {"message": {"alias": "msg"}}
+        class Config:
+            allow_population_by_field_name = True
 
 
 class BotAuth(BaseModel):
@@ -132,7 +137,7 @@ class MentionedUser(BaseModel):
     type: Literal["mentioned_user"] = Field(default="mentioned_user", repr=False)
     user_id: str
 
-    user_name: Optional[str] = Field(exclude=True)
+    user_name: Optional[str] = Field(default=None, exclude=True)
 
 
 class MentionedAll(BaseModel):
@@ -146,7 +151,7 @@ class VillaRoomLink(BaseModel):
     villa_id: str
     room_id: str
 
-    room_name: Optional[str] = Field(exclude=True)
+    room_name: Optional[str] = Field(default=None, exclude=True)
 
 
 class Link(BaseModel):
@@ -205,7 +210,7 @@ class Badge(BaseModel):
 class PostMessageContent(BaseModel):
     post_id: str
 
-    @validator("post_id")
+    @field_validator("post_id")
     @classmethod
     def __deal_post_id(cls, v: str):
         s = v.split("/")[-1]
@@ -245,11 +250,11 @@ class User(BaseModel):
     id: str
     portrait: str
 
-    @validator("extra", pre=True)
+    @field_validator("extra", pre=True)
     @classmethod
     def extra_str_to_dict(cls, v: Any):
         if isinstance(v, str):
-            return json.loads(v)
+            return loads(v)
         return v
 
 
@@ -547,8 +552,8 @@ class WebsocketInfo(BaseModel):
 
 
 for _, obj in inspect.getmembers(sys.modules[__name__]):
-    if inspect.isclass(obj) and issubclass(obj, BaseModel):
-        obj.update_forward_refs()
+    if inspect.isclass(obj) and issubclass(obj, BaseModel) and obj is not BaseModel:
+        model_rebuild(obj)
 
 
 __all__ = [
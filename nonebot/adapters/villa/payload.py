@@ -5,6 +5,8 @@ from typing import Literal
 from google.protobuf.json_format import MessageToDict, Parse
 from pydantic import BaseModel
 
+from .codec import model_dumps
+from .compat import model_validate
 from .pb.command_pb2 import (
     PHeartBeat,  # type: ignore
     PHeartBeatReply,  # type: ignore
@@ -94,7 +96,7 @@ class HeartBeat(BaseModel):
             id=id,
             flag=1,
             biz_type=BizType.P_HEARTBEAT,
-            body_data=Parse(self.json(), PHeartBeat()).SerializeToString(),
+            body_data=Parse(model_dumps(self), PHeartBeat()).SerializeToString(),
         ).to_bytes()
 
 
@@ -108,7 +110,8 @@ class HeartBeatReply(BaseModel):
 
     @classmethod
     def from_proto(cls, content: bytes) -> "HeartBeatReply":
-        return cls.parse_obj(
+        return model_validate(
+            cls,
             MessageToDict(
                 PHeartBeatReply().FromString(content),
                 preserving_proto_field_name=True,
@@ -139,7 +142,7 @@ class Login(BaseModel):
             id=id,
             flag=1,
             biz_type=BizType.P_LOGIN,
-            body_data=Parse(self.json(), PLogin()).SerializeToString(),
+            body_data=Parse(model_dumps(self), PLogin()).SerializeToString(),
         ).to_bytes()
 
 
@@ -157,7 +160,8 @@ class LoginReply(BaseModel):
 
     @classmethod
     def from_proto(cls, content: bytes) -> "LoginReply":
-        return cls.parse_obj(
+        return model_validate(
+            cls,
             MessageToDict(
                 PLoginReply().FromString(content),
                 preserving_proto_field_name=True,
@@ -185,7 +189,7 @@ class Logout(BaseModel):
             id=id,
             flag=1,
             biz_type=BizType.P_LOGOUT,
-            body_data=Parse(self.json(), PLogout()).SerializeToString(),
+            body_data=Parse(model_dumps(self), PLogout()).SerializeToString(),
         ).to_bytes()
 
 
@@ -201,7 +205,8 @@ class LogoutReply(BaseModel):
 
     @classmethod
     def from_proto(cls, content: bytes) -> "LogoutReply":
-        return cls.parse_obj(
+        return model_validate(
+            cls,
             MessageToDict(
                 PLogoutReply().FromString(content),
                 preserving_proto_field_name=True,
@@ -220,7 +225,8 @@ class KickOff(BaseModel):
 
     @classmethod
     def from_proto(cls, content: bytes) -> "KickOff":
-        return cls.parse_obj(
+        return model_validate(
+            cls,
             MessageToDict(
                 PKickOff().FromString(content),
                 preserving_proto_field_name=True,
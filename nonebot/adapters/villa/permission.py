@@ -3,8 +3,12 @@ from typing import Union
 from nonebot.permission import Permission
 
 from .bot import Bot
+from .decoder import raw_response
 from .event import AddQuickEmoticonEvent, SendMessageEvent
-from .models import RoleType
+from .models import (
+    Permission as VillaPermission,
+    RoleType,
+)
 
 
 async def is_owner_or_admin(
@@ -12,7 +16,8 @@ async def is_owner_or_admin(
     event: Union[SendMessageEvent, AddQuickEmoticonEvent],
 ) -> bool:
     user_id = event.from_user_id if isinstance(event, SendMessageEvent) else event.uid
-    user = await bot.get_member(villa_id=event.villa_id, uid=user_id)
+    with raw_response(False):
+        user = await bot.get_member(villa_id=event.villa_id, uid=user_id)
     return any(
         role.role_type in (RoleType.OWNER, RoleType.ADMIN) for role in user.role_list
     )
@@ -27,7 +32,8 @@ async def is_owner(
     event: Union[SendMessageEvent, AddQuickEmoticonEvent],
 ) -> bool:
     user_id = event.from_user_id if isinstance(event, SendMessageEvent) else event.uid
-    user = await bot.get_member(villa_id=event.villa_id, uid=user_id)
+    with raw_response(False):
+        user = await bot.get_member(villa_id=event.villa_id, uid=user_id)
     return any(role.role_type == RoleType.OWNER for role in user.role_list)
 
 
@@ -40,9 +46,38 @@ async def is_admin(
     event: Union[SendMessageEvent, AddQuickEmoticonEvent],
 ) -> bool:
     user_id = event.from_user_id if isinstance(event, SendMessageEvent) else event.uid
-    user = await bot.get_member(villa_id=event.villa_id, uid=user_id)
+    with raw_response(False):
+        user = await bot.get_member(villa_id=event.villa_id, uid=user_id)
     return any(role.role_type == RoleType.ADMIN for role in user.role_list)
 
 
 ADMIN = Permission(is_admin)
 """管理员权限"""
+
+
+def has_permission(*permissions: VillaPermission) -> Permission:
+    """拥有全部给定权限的成员
+
+    使用 `VillaContext` 缓存的身份组权限索引判断，
+    成员目录已同步时不需要请求 API
+
+    参数:
+        permissions: 需要的权限
+
+    返回:
+        Permission: 权限对象
+    """
+
+    async def _has_permission(
+        bot: Bot,
+        event: Union[SendMessageEvent, AddQuickEmoticonEvent],
+    ) -> bool:
+        user_id = (
+            event.from_user_id if isinstance(event, SendMessageEvent) else event.uid
+        )
+        context = bot.get_villa_context(event.villa_id)
+        index = await context.get_role_index()
+        role_ids = await context.get_member_role_ids(user_id)
+        return index.has_permission(role_ids, *permissions)
+
+    return Permission(_has_permission)
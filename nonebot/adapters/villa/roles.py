@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, List, Optional
+
+from .models import MemberRole, Permission, RoleType
+
+PERMISSION_BITS: Dict[Permission, int] = {
+    permission: 1 << index for index, permission in enumerate(Permission)
+}
+"""每个权限对应的位"""
+ALL_PERMISSIONS = (1 << len(PERMISSION_BITS)) - 1
+
+
+def permission_mask(permissions: Iterable[Permission]) -> int:
+    """将权限列表转换为位集合"""
+    mask = 0
+    for permission in permissions:
+        mask |= PERMISSION_BITS[permission]
+    return mask
+
+
+class RoleIndex:
+    """大别野身份组索引，将每个身份组的权限保存为位集合
+
+    房东身份组视为拥有全部权限
+
+    参数:
+        roles: `Bot.get_villa_member_roles` 的结果
+    """
+
+    def __init__(self, roles: List[MemberRole]) -> None:
+        self.roles: Dict[int, MemberRole] = {role.id: role for role in roles}
+        self._masks: Dict[int, int] = {
+            role.id: (
+                ALL_PERMISSIONS
+                if role.role_type == RoleType.OWNER
+                else permission_mask(role.permissions or ())
+            )
+            for role in roles
+        }
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    def get(self, role_id: int) -> Optional[MemberRole]:
+        return self.roles.get(role_id)
+
+    def mask_of(self, role_ids: Iterable[int]) -> int:
+        """计算一组身份组拥有的全部权限"""
+        mask = 0
+        for role_id in role_ids:
+            mask |= self._masks.get(role_id, 0)
+        return mask
+
+    def has_permission(
+        self,
+        role_ids: Iterable[int],
+        *permissions: Permission,
+    ) -> bool:
+        """拥有这些身份组的成员是否拥有全部给定的权限"""
+        required = permission_mask(permissions)
+        return self.mask_of(role_ids) & required == required
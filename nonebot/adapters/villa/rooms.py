@@ -0,0 +1,45 @@
+from typing import Dict, Iterator, List, Optional
+
+from .models import GroupRoom, ListRoom
+
+
+class RoomTree:
+    """大别野的分组-房间树，以及按房间 ID、分组 ID 和房间名称的索引
+
+    参数:
+        groups: `Bot.get_villa_group_room_list` 的结果
+    """
+
+    def __init__(self, groups: List[GroupRoom]) -> None:
+        self.groups: Dict[int, GroupRoom] = {group.group_id: group for group in groups}
+        self.rooms: Dict[int, ListRoom] = {}
+        self._by_name: Dict[str, List[ListRoom]] = {}
+        for group in groups:
+            for room in group.room_list:
+                self.rooms[room.room_id] = room
+                self._by_name.setdefault(room.room_name, []).append(room)
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def __contains__(self, room_id: int) -> bool:
+        return room_id in self.rooms
+
+    def __iter__(self) -> Iterator[ListRoom]:
+        return iter(self.rooms.values())
+
+    def get_room(self, room_id: int) -> Optional[ListRoom]:
+        return self.rooms.get(room_id)
+
+    def get_group(self, group_id: int) -> Optional[GroupRoom]:
+        return self.groups.get(group_id)
+
+    def group_of(self, room_id: int) -> Optional[GroupRoom]:
+        """获取房间所在的分组"""
+        if (room := self.rooms.get(room_id)) is None:
+            return None
+        return self.groups.get(room.group_id)
+
+    def find_rooms(self, room_name: str) -> List[ListRoom]:
+        """按房间名称查找房间，名称可能重复"""
+        return list(self._by_name.get(room_name, ()))
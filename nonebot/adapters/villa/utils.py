@@ -1,7 +1,8 @@
 from functools import partial
 import hashlib
-import imghdr
+from pathlib import Path
 import re
+import struct
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -9,9 +10,11 @@ from typing import (
     Callable,
     Dict,
     Generic,
+    NamedTuple,
     Optional,
     Type,
     TypeVar,
+    Union,
     overload,
 )
 from typing_extensions import Concatenate, ParamSpec
@@ -71,9 +74,103 @@ class API(Generic[B, P, R]):
         return await self.func(inst, *args, **kwds)
 
 
+class ImageInfo(NamedTuple):
+    ext: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+_JPEG_SOF_MARKERS = frozenset(
+    (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF),
+)
+
+
+def _sniff_jpeg(header: bytes) -> ImageInfo:
+    i = 2
+    while i + 9 <= len(header):
+        if header[i] != 0xFF:
+            i += 1
+            continue
+        marker = header[i + 1]
+        if marker == 0xFF:
+            i += 1
+        elif marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", header, i + 5)
+            return ImageInfo("jpeg", width, height)
+        elif marker == 0xD8 or marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            i += 2
+        else:
+            i += 2 + struct.unpack_from(">H", header, i + 2)[0]
+    return ImageInfo("jpeg")
+
+
+def _sniff_webp(header: bytes) -> ImageInfo:
+    chunk = header[12:16]
+    if chunk == b"VP8 " and len(header) >= 30 and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack_from("<HH", header, 26)
+        return ImageInfo("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L" and len(header) >= 25 and header[20] == 0x2F:
+        bits = int.from_bytes(header[21:25], "little")
+        return ImageInfo("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X" and len(header) >= 30:
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return ImageInfo("webp", width, height)
+    return ImageInfo("webp")
+
+
+def sniff_image(header: bytes) -> Optional[ImageInfo]:
+    """根据文件头识别图片格式和尺寸，支持 png、jpeg、gif、webp 和 bmp
+
+    参数:
+        header: 图片开头的若干字节，jpeg 的尺寸信息可能位于较后的位置
+
+    返回:
+        Optional[ImageInfo]: 图片格式和尺寸，无法识别时返回 None
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(header) >= 24:
+            width, height = struct.unpack_from(">II", header, 16)
+            return ImageInfo("png", width, height)
+        return ImageInfo("png")
+    if header.startswith(b"\xff\xd8\xff"):
+        return _sniff_jpeg(header)
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        if len(header) >= 10:
+            width, height = struct.unpack_from("<HH", header, 6)
+            return ImageInfo("gif", width, height)
+        return ImageInfo("gif")
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return _sniff_webp(header)
+    if header.startswith(b"BM"):
+        if len(header) >= 26:
+            if struct.unpack_from("<I", header, 14)[0] == 12:
+                width, height = struct.unpack_from("<HH", header, 18)
+            else:
+                width, height = struct.unpack_from("<ii", header, 18)
+            return ImageInfo("bmp", width, abs(height))
+        return ImageInfo("bmp")
+    return None
+
+
 def get_img_extenion(img_bytes: bytes) -> Optional[str]:
-    return imghdr.what(None, h=img_bytes)
+    info = sniff_image(img_bytes[:32])
+    return info.ext if info is not None else None
 
 
-def get_img_md5(img_bytes: bytes) -> str:
+def get_img_md5(img_bytes: Union[bytes, memoryview]) -> str:
     return hashlib.md5(img_bytes).hexdigest()
+
+
+def get_file_md5(path: Path, chunk_size: int = 1 << 16) -> str:
+    """分块计算文件 md5，不会将整个文件读入内存"""
+    md5 = hashlib.md5()
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def read_file_header(path: Path, size: int = 64 * 1024) -> bytes:
+    with path.open("rb") as f:
+        return f.read(size)